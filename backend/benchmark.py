@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for request hot paths in server.py.
+
+Runs without MongoDB: scenarios work on in-memory sample documents shaped like
+the stored ones.
+
+    python benchmark.py                      # every offline scenario
+    python benchmark.py validation --items 50 --rounds 500
+    python benchmark.py email                # needs fake_mailgun.py running
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+import server  # noqa: E402
+
+ISLANDS = ["New Providence", "Grand Bahama", "Abaco", "Eleuthera", "Exuma"]
+CATEGORIES = ["Restaurant", "Tour Operator", "Beauty & Spa", "Auto Repair", "Retail"]
+
+def sample_business(i: int) -> dict:
+    """A stored business document, as written by create_business"""
+    now = datetime.utcnow()
+    return {
+        "_id": uuid.uuid4().hex[:24],
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "business_name": f"Island Business {i}",
+        "description": "Family run business serving locals and visitors across the islands. " * 3,
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "island": ISLANDS[i % len(ISLANDS)],
+        "address": f"{i} Bay Street, Nassau",
+        "latitude": 25.04 + i / 1000,
+        "longitude": -77.35 - i / 1000,
+        "phone": "242-555-0100",
+        "email": f"owner{i}@example.com",
+        "website": f"https://business{i}.example.com",
+        "business_hours": {day: "9:00-17:00" for day in ["mon", "tue", "wed", "thu", "fri"]},
+        "services": ["Consultation", "Delivery", "Custom orders", "Gift cards"],
+        "photos": [f"https://res.cloudinary.com/demo/image/upload/{i}_{n}.jpg" for n in range(4)],
+        "profile_photo": None,
+        "cover_photo": None,
+        "logo": None,
+        "license_number": f"BS-{i:05d}",
+        "license_document": None,
+        "status": "approved",
+        "subscription_status": "active",
+        "trial_end_date": now + timedelta(days=7),
+        "rating_average": 4.5,
+        "rating_count": 12,
+        "accepts_appointments": i % 2 == 0,
+        "appointment_duration": 60,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+def time_per_call(fn, rounds: int) -> float:
+    """Best-of-three average wall time of fn() in microseconds"""
+    fn()
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        best = min(best, (time.perf_counter() - start) / rounds)
+    return best * 1_000_000
+
+def report(name: str, baseline: tuple, candidate: tuple):
+    (baseline_label, baseline_us), (candidate_label, candidate_us) = baseline, candidate
+    print(f"[{name}]")
+    print(f"  {baseline_label:<40} {baseline_us:10.1f} us/request")
+    print(f"  {candidate_label:<40} {candidate_us:10.1f} us/request")
+    print(f"  saved {baseline_us - candidate_us:.1f} us/request ({baseline_us / candidate_us:.1f}x)")
+
+def bench_validation(args):
+    """List page of businesses: validating read path vs. trusted read path"""
+    documents = [sample_business(i) for i in range(args.items)]
+    adapter = TypeAdapter(List[server.BusinessProfile])
+
+    def validated():
+        # Model per document, then FastAPI's response_model check and jsonable_encoder
+        items = [server.BusinessProfile(**document).model_dump() for document in documents]
+        checked = adapter.validate_python(items)
+        return json.dumps(jsonable_encoder(checked)).encode("utf-8")
+
+    def trusted():
+        return server.TrustedJSONResponse([server.trusted_dump(server.BusinessProfile, document) for document in documents]).body
+
+    report(
+        f"validation, {args.items} items",
+        ("validated models + response_model", time_per_call(validated, args.rounds)),
+        ("trusted_dump + TrustedJSONResponse", time_per_call(trusted, args.rounds)),
+    )
+
+def bench_json(args):
+    """Encoding a business page with the stdlib and orjson JSON_RESPONSE_BACKENDs"""
+    items = [server.trusted_dump(server.BusinessProfile, sample_business(i)) for i in range(args.items)]
+    stdlib_encode, orjson_encode = server.json_encoder("stdlib"), server.json_encoder("orjson")
+
+    report(
+        f"json encoding, {args.items} items",
+        ("stdlib", time_per_call(lambda: stdlib_encode(items), args.rounds)),
+        ("orjson", time_per_call(lambda: orjson_encode(items), args.rounds)),
+    )
+    # Routes without a Response of their own still go through jsonable_encoder first
+    report(
+        f"default response class, {args.items} items",
+        ("jsonable_encoder + JSONResponse", time_per_call(lambda: JSONResponse(jsonable_encoder(items)).body, args.rounds)),
+        ("jsonable_encoder + orjson", time_per_call(lambda: orjson_encode(jsonable_encoder(items)), args.rounds)),
+    )
+
+def bench_compression(args):
+    """CPU time and size of a business page at the levels CompressionMiddleware can use"""
+    body = server.encode_json([server.trusted_dump(server.BusinessProfile, sample_business(i)) for i in range(args.items)])
+    print(f"[compression, {args.items} items, {len(body)} bytes]")
+    settings = [("gzip", level) for level in (1, 6, 9)]
+    middleware = server.CompressionMiddleware(None)
+    if middleware.brotli:
+        settings += [("br", quality) for quality in (1, 4, 11)]
+    for encoding, level in settings:
+        middleware.gzip_level = middleware.brotli_quality = level
+        compressed = middleware.compress(encoding, body)
+        elapsed = time_per_call(lambda: middleware.compress(encoding, body), args.rounds)
+        print(f"  {encoding:<5} level {level:<3} {len(compressed):8d} bytes ({len(compressed) / len(body):6.1%}) {elapsed:10.1f} us/request")
+
+def bench_email(args):
+    """Email throughput against fake_mailgun.py: blocking requests.post vs EmailDispatcher"""
+    import requests
+
+    count = args.emails
+    url = f"{args.mailgun_url}/v3/benchmark.test/messages"
+    data = {"from": "bench@benchmark.test", "to": "user@example.com", "subject": "Benchmark", "html": "<p>Hi</p>"}
+
+    start = time.perf_counter()
+    for _ in range(count):
+        requests.post(url, auth=("api", "benchmark"), data=data, timeout=10)
+    blocking = time.perf_counter() - start
+
+    async def dispatch() -> dict:
+        dispatcher = server.EmailDispatcher(
+            base_url=args.mailgun_url,
+            api_key="benchmark",
+            domain="benchmark.test",
+            from_email="bench@benchmark.test",
+            workers=args.workers,
+            max_queue=count
+        )
+        await dispatcher.start()
+        for _ in range(count):
+            dispatcher.enqueue("user@example.com", "Benchmark", "<p>Hi</p>")
+        await dispatcher.stop(drain_timeout=600)
+        return dispatcher.stats()
+
+    start = time.perf_counter()
+    stats = asyncio.run(dispatch())
+    dispatched = time.perf_counter() - start
+
+    print(f"[email, {count} messages]")
+    print(f"  {'requests.post, one at a time':<40} {count / blocking:10.1f} emails/s")
+    print(f"  {f'EmailDispatcher, {args.workers} workers':<40} {count / dispatched:10.1f} emails/s")
+    print(f"  sent {stats['sent']}, failed {stats['failed']}, retried {stats['retried']}")
+
+def bench_logins(args):
+    """Password checks per second for concurrent logins: inline bcrypt vs PasswordHasher"""
+    import bcrypt
+
+    hasher = server.PasswordHasher(rounds=args.bcrypt_rounds, max_pending=args.logins)
+    hashed = bcrypt.hashpw(b"correct horse battery staple", bcrypt.gensalt(args.bcrypt_rounds))
+
+    async def inline():
+        # What login did before: checkpw on the event loop, so requests run one at a time
+        async def login():
+            return bcrypt.checkpw(b"correct horse battery staple", hashed)
+        return await asyncio.gather(*(login() for _ in range(args.logins)))
+
+    async def pooled():
+        return await asyncio.gather(*(
+            hasher.verify("correct horse battery staple", hashed.decode("utf-8")) for _ in range(args.logins)
+        ))
+
+    timings = {}
+    for label, run in (("inline bcrypt.checkpw", inline), (f"PasswordHasher, {hasher.executor._max_workers} threads", pooled)):
+        start = time.perf_counter()
+        assert all(asyncio.run(run()))
+        timings[label] = args.logins / (time.perf_counter() - start)
+    hasher.executor.shutdown()
+
+    print(f"[logins, {args.logins} concurrent, cost {args.bcrypt_rounds}]")
+    for label, rate in timings.items():
+        print(f"  {label:<40} {rate:10.1f} logins/s")
+
+SCENARIOS = {
+    "validation": bench_validation,
+    "json": bench_json,
+    "compression": bench_compression,
+    "email": bench_email,
+    "logins": bench_logins,
+}
+# Scenarios that need a local stand-in service; only run when named
+SERVICE_SCENARIOS = {"email"}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server hot paths")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all offline ones)")
+    parser.add_argument("--items", type=int, default=50, help="Items per page")
+    parser.add_argument("--rounds", type=int, default=200, help="Requests per timing run")
+    parser.add_argument("--mailgun-url", default="http://127.0.0.1:8025", help="fake_mailgun.py address (email)")
+    parser.add_argument("--emails", type=int, default=200, help="Messages to send (email)")
+    parser.add_argument("--workers", type=int, default=8, help="Dispatcher workers (email)")
+    parser.add_argument("--logins", type=int, default=32, help="Concurrent logins (logins)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=int(os.environ.get("BCRYPT_ROUNDS", "12")), help="bcrypt cost (logins)")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    for name in args.scenarios or [name for name in SCENARIOS if name not in SERVICE_SCENARIOS]:
+        SCENARIOS[name](args)
+
+if __name__ == "__main__":
+    main()
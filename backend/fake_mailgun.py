@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Mailgun messages API, for email throughput tests.
+
+    python fake_mailgun.py --port 8025 --latency 0.05 --failure-rate 0.1
+
+Then run the server (or benchmark.py email) with
+MAILGUN_BASE_URL=http://localhost:8025 and any MAILGUN_API_KEY.
+"""
+import argparse
+import asyncio
+import random
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Form, HTTPException
+
+app = FastAPI()
+settings = {"latency": 0.0, "failure_rate": 0.0}
+stats = {"accepted": 0, "failed": 0}
+
+@app.post("/v3/{domain}/messages")
+async def send_message(domain: str, to: str = Form(...), subject: str = Form(...)):
+    await asyncio.sleep(settings["latency"])
+    if random.random() < settings["failure_rate"]:
+        stats["failed"] += 1
+        raise HTTPException(status_code=503, detail="Simulated outage")
+    stats["accepted"] += 1
+    return {"id": f"<{uuid.uuid4()}@{domain}>", "message": "Queued. Thank you."}
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Mailgun messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before each reply")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    settings["latency"] = args.latency
+    settings["failure_rate"] = args.failure_rate
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
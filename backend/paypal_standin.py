@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Local stand-in for the PayPal REST endpoints used by server.py, for load tests.
+
+    python paypal_standin.py --port 8026 --latency 0.2
+
+Run the server with PAYPAL_ENDPOINT=http://localhost:8026 (any client id and
+secret). Payments and billing agreements are kept in memory; approval links
+point back at the stand-in.
+"""
+import argparse
+import asyncio
+import uuid
+from datetime import datetime
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Response
+
+app = FastAPI()
+settings = {"latency": 0.0, "base_url": "http://127.0.0.1:8026"}
+payments = {}
+billing_plans = {}
+billing_agreements = {}
+
+@app.middleware("http")
+async def simulate_latency(request: Request, call_next):
+    await asyncio.sleep(settings["latency"])
+    return await call_next(request)
+
+def approval_links(resource_id: str) -> list:
+    return [{"href": f"{settings['base_url']}/approve/{resource_id}", "rel": "approval_url", "method": "REDIRECT"}]
+
+@app.post("/v1/oauth2/token")
+async def issue_token():
+    return {"scope": "https://api.paypal.com/v1/payments/.*", "access_token": f"A21-{uuid.uuid4().hex}", "token_type": "Bearer", "app_id": "APP-STANDIN", "expires_in": 32400}
+
+@app.post("/v1/payments/payment")
+async def create_payment(request: Request):
+    payment = {**await request.json(), "id": f"PAYID-{uuid.uuid4().hex[:20].upper()}", "state": "created", "create_time": datetime.utcnow().isoformat() + "Z"}
+    payment["links"] = approval_links(payment["id"])
+    payments[payment["id"]] = payment
+    return payment
+
+@app.get("/v1/payments/payment/{payment_id}")
+async def get_payment(payment_id: str):
+    if payment_id not in payments:
+        raise HTTPException(status_code=404, detail="INVALID_RESOURCE_ID")
+    return payments[payment_id]
+
+@app.post("/v1/payments/payment/{payment_id}/execute")
+async def execute_payment(payment_id: str):
+    if payment_id not in payments:
+        raise HTTPException(status_code=404, detail="INVALID_RESOURCE_ID")
+    payments[payment_id]["state"] = "approved"
+    return payments[payment_id]
+
+@app.post("/v1/payments/billing-plans")
+async def create_billing_plan(request: Request):
+    plan = {**await request.json(), "id": f"P-{uuid.uuid4().hex[:24].upper()}", "state": "CREATED"}
+    billing_plans[plan["id"]] = plan
+    return plan
+
+@app.patch("/v1/payments/billing-plans/{plan_id}")
+async def update_billing_plan(plan_id: str):
+    if plan_id not in billing_plans:
+        raise HTTPException(status_code=404, detail="INVALID_RESOURCE_ID")
+    billing_plans[plan_id]["state"] = "ACTIVE"
+    return Response(status_code=200)
+
+@app.post("/v1/payments/billing-agreements")
+async def create_billing_agreement(request: Request):
+    agreement = {**await request.json(), "id": f"I-{uuid.uuid4().hex[:12].upper()}", "state": "Pending"}
+    agreement["links"] = approval_links(agreement["id"])
+    billing_agreements[agreement["id"]] = agreement
+    return agreement
+
+@app.post("/v1/payments/billing-agreements/{agreement_id}/agreement-execute")
+async def execute_billing_agreement(agreement_id: str):
+    if agreement_id not in billing_agreements:
+        raise HTTPException(status_code=404, detail="INVALID_RESOURCE_ID")
+    billing_agreements[agreement_id]["state"] = "Active"
+    return billing_agreements[agreement_id]
+
+@app.get("/v1/payments/billing-agreements/{agreement_id}")
+async def get_billing_agreement(agreement_id: str):
+    if agreement_id not in billing_agreements:
+        raise HTTPException(status_code=404, detail="INVALID_RESOURCE_ID")
+    return billing_agreements[agreement_id]
+
+@app.post("/v1/payments/billing-agreements/{agreement_id}/cancel")
+async def cancel_billing_agreement(agreement_id: str):
+    if agreement_id not in billing_agreements:
+        raise HTTPException(status_code=404, detail="INVALID_RESOURCE_ID")
+    billing_agreements[agreement_id]["state"] = "Cancelled"
+    return Response(status_code=204)
+
+def main():
+    parser = argparse.ArgumentParser(description="PayPal REST API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8026)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before each reply")
+    args = parser.parse_args()
+
+    settings["latency"] = args.latency
+    settings["base_url"] = f"http://{args.host}:{args.port}"
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
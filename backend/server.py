@@ -1,21 +1,41 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Depends, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Depends, BackgroundTasks, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 import uuid
-from datetime import datetime, timedelta
+import asyncio
+import base64
+import json
+import time
+import random
+import bisect
+import csv
+import io
+import zlib
+import hashlib
+from urllib.parse import urlparse
+import functools
+import itertools
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 import bcrypt
 import jwt
 from enum import Enum
 import re
 import paypalrestsdk
-import requests
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
@@ -28,8 +48,45 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# JSON response encoding
+# JSON_RESPONSE_BACKEND=orjson (default) or stdlib, which is kept for comparison
+def _json_default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", warnings=False)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def stdlib_encode_json(content: Any) -> bytes:
+    return json.dumps(content, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def json_encoder(backend: str):
+    """Return the encode function for a JSON_RESPONSE_BACKEND value"""
+    if backend == "stdlib":
+        return stdlib_encode_json
+    if backend != "orjson":
+        raise ValueError(f"Unknown JSON_RESPONSE_BACKEND: {backend}")
+    
+    import orjson
+    
+    def orjson_encode_json(content: Any) -> bytes:
+        # datetime, UUID, Enum and dataclasses are encoded natively; models go through _json_default
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    
+    return orjson_encode_json
+
+encode_json = json_encoder(os.environ.get('JSON_RESPONSE_BACKEND', 'orjson'))
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -39,16 +96,21 @@ JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-here')
 security = HTTPBearer()
 
 # PayPal Configuration
-paypalrestsdk.configure({
+PAYPAL_OPTIONS = {
     "mode": os.environ.get('PAYPAL_MODE', 'sandbox'),
     "client_id": os.environ.get('PAYPAL_CLIENT_ID'),
     "client_secret": os.environ.get('PAYPAL_CLIENT_SECRET')
-})
+}
+if os.environ.get('PAYPAL_ENDPOINT'):
+    # Overrides the sandbox/live API host, e.g. paypal_standin.py for load tests
+    PAYPAL_OPTIONS["endpoint"] = os.environ['PAYPAL_ENDPOINT']
+paypalrestsdk.configure(PAYPAL_OPTIONS)
 
 # Mailgun Configuration
 MAILGUN_API_KEY = os.environ.get('MAILGUN_API_KEY')
 MAILGUN_DOMAIN = os.environ.get('MAILGUN_DOMAIN', 'sandboxf8c8a7f3d9d44ea08c7f8b5c2e1a6b0d.mailgun.org')
 MAILGUN_FROM_EMAIL = os.environ.get('MAILGUN_FROM_EMAIL', 'noreply@direct-tree.com')
+MAILGUN_BASE_URL = os.environ.get('MAILGUN_BASE_URL', 'https://api.mailgun.net')  # point at fake_mailgun.py for load tests
 
 # Cloudinary Configuration
 cloudinary.config(
@@ -144,6 +206,8 @@ class BusinessProfile(BaseModel):
     category: str
     island: str
     address: str
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     phone: str
     email: EmailStr
     website: Optional[str] = None
@@ -171,6 +235,8 @@ class BusinessCreate(BaseModel):
     category: str
     island: str
     address: str
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     phone: str
     email: EmailStr
     website: Optional[str] = None
@@ -193,6 +259,7 @@ class Review(BaseModel):
     is_anonymous: bool = False
     is_approved: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None  # set when moderation changes the review
 
 class ReviewCreate(BaseModel):
     business_id: str
@@ -239,6 +306,12 @@ class PayPalSubscription(BaseModel):
     trial_days: int = 7
     trial_end_date: datetime
     next_billing_date: Optional[datetime] = None
+    last_synced_at: Optional[datetime] = None  # last check against PayPal
+    sync_attempts: int = 0  # consecutive failed checks, reset on success
+    sync_failed_at: Optional[datetime] = None
+    sync_retry_at: Optional[datetime] = None  # reconciler backs off until then
+    sync_lease_until: Optional[datetime] = None  # claimed by a reconciler worker until then
+    state_changed_at: Optional[datetime] = None  # when PayPal made the stored status change
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -368,51 +441,247 @@ class PhotoMetadata(BaseModel):
     content_type: str
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
 
+# PayPal utility functions
+class PayPalGatewayError(Exception):
+    """A PayPal call was rejected, failed or timed out"""
+
+class PayPalGateway:
+    """Async wrapper running paypalrestsdk calls on a dedicated executor.
+
+    All calls share one paypalrestsdk.Api, which caches the OAuth token until
+    it expires. Each call is bounded by `timeout` seconds; a call that times out
+    finishes in its executor thread but the request stops waiting for it.
+    """
+
+    def __init__(self, api: paypalrestsdk.Api, max_workers: int = 8, timeout: float = 20.0):
+        self.api = api
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="paypal")
+
+    async def _call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self.executor, functools.partial(func, *args)), self.timeout)
+        except asyncio.TimeoutError:
+            raise PayPalGatewayError(f"PayPal did not respond within {self.timeout:g}s")
+        except PayPalGatewayError:
+            raise
+        except Exception as e:
+            raise PayPalGatewayError(str(e)) from e
+
+    async def create_payment(self, body: dict) -> paypalrestsdk.Payment:
+        payment = paypalrestsdk.Payment(body, api=self.api)
+        if not await self._call(payment.create):
+            raise PayPalGatewayError(f"Payment creation failed: {payment.error}")
+        return payment
+
+    async def execute_payment(self, payment_id: str, payer_id: str) -> paypalrestsdk.Payment:
+        def execute():
+            payment = paypalrestsdk.Payment.find(payment_id, api=self.api)
+            if not payment.execute({"payer_id": payer_id}):
+                raise PayPalGatewayError(f"Payment execution failed: {payment.error}")
+            return payment
+        return await self._call(execute)
+
+    async def create_billing_plan(self, body: dict) -> paypalrestsdk.BillingPlan:
+        """Create and activate a billing plan"""
+        def create():
+            billing_plan = paypalrestsdk.BillingPlan(body, api=self.api)
+            if not billing_plan.create():
+                raise PayPalGatewayError(f"Failed to create billing plan: {billing_plan.error}")
+            if not billing_plan.activate():
+                raise PayPalGatewayError(f"Failed to activate billing plan: {billing_plan.error}")
+            return billing_plan
+        return await self._call(create)
+
+    async def create_agreement(self, body: dict) -> paypalrestsdk.BillingAgreement:
+        billing_agreement = paypalrestsdk.BillingAgreement(body, api=self.api)
+        if not await self._call(billing_agreement.create):
+            raise PayPalGatewayError(f"Failed to create subscription: {billing_agreement.error}")
+        return billing_agreement
+
+    async def execute_agreement(self, token: str) -> paypalrestsdk.BillingAgreement:
+        return await self._call(functools.partial(paypalrestsdk.BillingAgreement.execute, token, api=self.api))
+
+    async def find_agreement(self, agreement_id: str) -> paypalrestsdk.BillingAgreement:
+        return await self._call(functools.partial(paypalrestsdk.BillingAgreement.find, agreement_id, api=self.api))
+
+    async def cancel_agreement(self, agreement_id: str, note: str):
+        def cancel():
+            billing_agreement = paypalrestsdk.BillingAgreement.find(agreement_id, api=self.api)
+            if not billing_agreement.cancel({"note": note}):
+                raise PayPalGatewayError(f"Failed to cancel subscription: {billing_agreement.error}")
+        await self._call(cancel)
+
+    async def verify_webhook(self, headers, body: str, webhook_id: str) -> bool:
+        """Check a webhook's transmission signature against PayPal's certificate"""
+        cert_url = headers.get("paypal-cert-url", "")
+        parsed = urlparse(cert_url)
+        host = parsed.hostname or ""
+        # Only fetch signing certificates from PayPal itself
+        if parsed.scheme != "https" or not (host == "paypal.com" or host.endswith(".paypal.com")):
+            return False
+        return await self._call(
+            paypalrestsdk.WebhookEvent.verify,
+            headers.get("paypal-transmission-id"),
+            headers.get("paypal-transmission-time"),
+            webhook_id,
+            body,
+            cert_url,
+            headers.get("paypal-transmission-sig"),
+            "sha256"  # PayPal signs with SHA256withRSA
+        )
+
+paypal_gateway = PayPalGateway(
+    paypalrestsdk.Api(PAYPAL_OPTIONS),
+    max_workers=int(os.environ.get('PAYPAL_MAX_WORKERS', '8')),
+    timeout=float(os.environ.get('PAYPAL_TIMEOUT', '20'))
+)
+
 # Email utility functions
-def send_email(to_email: str, subject: str, html_content: str):
-    """Send email using Mailgun"""
-    try:
-        if not MAILGUN_API_KEY or MAILGUN_API_KEY == "PLACEHOLDER_MAILGUN_KEY":
+class EmailDispatcher:
+    """In-process email queue drained by workers that share one pooled HTTP client.
+
+    enqueue() never blocks the request: messages wait in a bounded queue and
+    are delivered to Mailgun by `workers` tasks. Timeouts, 429s and 5xx
+    responses are retried with exponential backoff and jitter; other 4xx
+    responses are permanent failures. Counters are exposed through stats().
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        domain: str,
+        from_email: str,
+        workers: int = 4,
+        max_queue: int = 1000,
+        max_attempts: int = 5,
+        backoff: float = 0.5,
+        timeout: float = 10.0
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.domain = domain
+        self.from_email = from_email
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._client = None
+        self._tasks: List[asyncio.Task] = []
+        self.metrics = {"queued": 0, "sent": 0, "failed": 0, "retried": 0, "dropped": 0, "mocked": 0}
+
+    @property
+    def mock(self) -> bool:
+        return not self.api_key or self.api_key == "PLACEHOLDER_MAILGUN_KEY"
+
+    async def start(self):
+        import httpx
+        
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            auth=("api", self.api_key or ""),
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers)
+        )
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """Give queued messages up to drain_timeout seconds, then stop the workers"""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Email dispatcher stopped with {self.queue.qsize()} messages undelivered")
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def enqueue(self, to_email: str, subject: str, html_content: str) -> bool:
+        if self.mock:
+            self.metrics["mocked"] += 1
             logger.info(f"[MOCK EMAIL] To: {to_email}, Subject: {subject}")
             return True
+        if not self._tasks:
+            logger.error(f"Email dispatcher not running, dropping email to {to_email}")
+            self.metrics["dropped"] += 1
+            return False
+        try:
+            self.queue.put_nowait({"to": to_email, "subject": subject, "html": html_content})
+        except asyncio.QueueFull:
+            logger.error(f"Email queue full, dropping email to {to_email}")
+            self.metrics["dropped"] += 1
+            return False
+        self.metrics["queued"] += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            message = await self.queue.get()
+            try:
+                await self._deliver(message)
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.error(f"Email send error: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    async def _deliver(self, message: dict):
+        import httpx
         
-        logger.info(f"Attempting to send email to {to_email} via Mailgun")
-        
-        # Mailgun API endpoint
-        mailgun_url = f"https://api.mailgun.net/v3/{MAILGUN_DOMAIN}/messages"
-        
-        # Prepare the email data
         data = {
-            "from": f"The Direct Tree <{MAILGUN_FROM_EMAIL}>",
-            "to": to_email,
-            "subject": subject,
-            "html": html_content
+            "from": f"The Direct Tree <{self.from_email}>",
+            "to": message["to"],
+            "subject": message["subject"],
+            "html": message["html"]
         }
-        
-        # Send email via Mailgun API
-        response = requests.post(
-            mailgun_url,
-            auth=("api", MAILGUN_API_KEY),
-            data=data,
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            logger.info(f"Email sent successfully to {to_email}")
-            return True
-        else:
-            logger.error(f"Mailgun API error: {response.status_code} - {response.text}")
-            return False
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = await self._client.post(f"/v3/{self.domain}/messages", data=data)
+                if response.status_code == 200:
+                    self.metrics["sent"] += 1
+                    logger.info(f"Email sent successfully to {message['to']}")
+                    return
+                error = f"{response.status_code} - {response.text}"
+                retryable = response.status_code == 429 or response.status_code >= 500
+            except httpx.TransportError as e:
+                error, retryable = str(e) or type(e).__name__, True
             
-    except Exception as e:
-        logger.error(f"Email send error: {str(e)}")
-        return False
+            if not retryable or attempt == self.max_attempts:
+                self.metrics["failed"] += 1
+                logger.error(f"Mailgun API error after {attempt} attempt(s) for {message['to']}: {error}")
+                return
+            self.metrics["retried"] += 1
+            await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+
+    def stats(self) -> dict:
+        return {**self.metrics, "pending": self.queue.qsize(), "workers": len(self._tasks)}
+
+email_dispatcher = EmailDispatcher(
+    base_url=MAILGUN_BASE_URL,
+    api_key=MAILGUN_API_KEY,
+    domain=MAILGUN_DOMAIN,
+    from_email=MAILGUN_FROM_EMAIL,
+    workers=int(os.environ.get('EMAIL_WORKERS', '4')),
+    max_queue=int(os.environ.get('EMAIL_QUEUE_SIZE', '1000')),
+    max_attempts=int(os.environ.get('EMAIL_MAX_ATTEMPTS', '5'))
+)
+
+async def send_email(to_email: str, subject: str, html_content: str) -> bool:
+    """Queue an email for delivery via Mailgun"""
+    return email_dispatcher.enqueue(to_email, subject, html_content)
 
 def generate_verification_token() -> str:
     """Generate a secure verification token"""
     return str(uuid.uuid4())
 
-def send_verification_email(user_email: str, user_name: str, verification_token: str):
+async def send_verification_email(user_email: str, user_name: str, verification_token: str):
     """Send email verification"""
     verification_url = f"{os.environ.get('FRONTEND_URL')}/verify-email?token={verification_token}"
     
@@ -455,9 +724,9 @@ def send_verification_email(user_email: str, user_name: str, verification_token:
     </html>
     """
     
-    return send_email(user_email, "Verify Your Email - The Direct Tree", html_content)
+    return await send_email(user_email, "Verify Your Email - The Direct Tree", html_content)
 
-def send_welcome_email(user_email: str, user_name: str):
+async def send_welcome_email(user_email: str, user_name: str):
     """Send welcome email after verification"""
     html_content = f"""
     <html>
@@ -496,9 +765,9 @@ def send_welcome_email(user_email: str, user_name: str):
     </html>
     """
     
-    return send_email(user_email, "Welcome to The Direct Tree!", html_content)
+    return await send_email(user_email, "Welcome to The Direct Tree!", html_content)
 
-def send_payment_confirmation_email(user_email: str, user_name: str, amount: str):
+async def send_payment_confirmation_email(user_email: str, user_name: str, amount: str):
     """Send payment confirmation email"""
     html_content = f"""
     <html>
@@ -542,9 +811,9 @@ def send_payment_confirmation_email(user_email: str, user_name: str, amount: str
     </html>
     """
     
-    return send_email(user_email, "Payment Confirmed - The Direct Tree", html_content)
+    return await send_email(user_email, "Payment Confirmed - The Direct Tree", html_content)
 
-def send_appointment_notification(business_email: str, customer_email: str, appointment_details: dict):
+async def send_appointment_notification(business_email: str, customer_email: str, appointment_details: dict):
     """Send appointment notifications to both business and customer"""
     business_html = f"""
     <html>
@@ -599,10 +868,10 @@ def send_appointment_notification(business_email: str, customer_email: str, appo
     """
     
     # Send to both
-    send_email(business_email, "New Appointment Request - The Direct Tree", business_html)
-    send_email(customer_email, "Appointment Request Sent - The Direct Tree", customer_html)
+    await send_email(business_email, "New Appointment Request - The Direct Tree", business_html)
+    await send_email(customer_email, "Appointment Request Sent - The Direct Tree", customer_html)
 
-def send_event_payment_confirmation(organizer_email: str, organizer_name: str, event_title: str, event_date: str):
+async def send_event_payment_confirmation(organizer_email: str, organizer_name: str, event_title: str, event_date: str):
     """Send event payment confirmation email"""
     html_content = f"""
     <html>
@@ -640,14 +909,74 @@ def send_event_payment_confirmation(organizer_email: str, organizer_name: str, e
     </html>
     """
     
-    return send_email(organizer_email, f"Event Payment Confirmed - {event_title}", html_content)
+    return await send_email(organizer_email, f"Event Payment Confirmed - {event_title}", html_content)
 
 # Utility functions
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def business_document(business: BusinessProfile) -> Dict:
+    """Stored form of a business, with a GeoJSON point for the 2dsphere index when located"""
+    document = business.dict()
+    if business.latitude is not None and business.longitude is not None:
+        document["geo"] = {"type": "Point", "coordinates": [business.longitude, business.latitude]}
+    return document
+
+class PasswordHasher:
+    """bcrypt hashing on a dedicated thread pool.
+
+    bcrypt releases the GIL while it works, so `workers` threads hash in
+    parallel without holding the event loop. At most `max_pending` operations
+    may be running or queued; beyond that callers get a 503 instead of
+    queueing without bound.
+    """
+
+    def __init__(self, rounds: int = 12, workers: Optional[int] = None, max_pending: int = 64):
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.metrics = {"hashed": 0, "verified": 0, "rehashed": 0, "rejected": 0}
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.metrics["rejected"] += 1
+            raise HTTPException(status_code=503, detail="Server busy, please try again", headers={"Retry-After": "1"})
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    def _hash(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)).decode('utf-8')
+
+    async def hash(self, password: str) -> str:
+        self.metrics["hashed"] += 1
+        return await self._run(self._hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        self.metrics["verified"] += 1
+        return await self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when a stored hash ("$2b$<cost>$...") was made with a different cost than `rounds`"""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def stats(self) -> dict:
+        return {**self.metrics, "pending": self.pending, "rounds": self.rounds}
+
+password_hasher = PasswordHasher(
+    rounds=int(os.environ.get('BCRYPT_ROUNDS', '12')),
+    workers=int(os.environ['PASSWORD_HASH_WORKERS']) if os.environ.get('PASSWORD_HASH_WORKERS') else None,
+    max_pending=int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '64'))
+)
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await password_hasher.verify(password, hashed)
 
 def create_jwt_token(user_id: str, role: str) -> str:
     payload = {
@@ -669,10 +998,26 @@ def verify_jwt_token(token: str) -> Dict:
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     payload = verify_jwt_token(token)
+    session_key = f"user:{payload['user_id']}:{token.rsplit('.', 1)[-1]}"
+    cached_user = await cache_backend.get(session_key)
+    if cached_user is not None:
+        # The password hash is never cached; sessions don't need it
+        return User.model_construct(password="", **cached_user)
+    
+    # Read before the user so an invalidate_user during the lookup skips the write below
+    tag = f"user:{payload['user_id']}"
+    generations = await cache_backend.tag_generations([tag])
     user = await db.users.find_one({"id": payload["user_id"]})
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    return User(**user)
+    current_user = User(**user)
+    await cache_backend.set_many(
+        {session_key: current_user.model_dump(exclude={"password"})},
+        USER_CACHE_TTL,
+        [tag],
+        expected_generations=generations
+    )
+    return current_user
 
 def filter_profanity(text: str) -> str:
     # Simple profanity filter - you can enhance this
@@ -681,6 +1026,924 @@ def filter_profanity(text: str) -> str:
         text = re.sub(r'\b' + word + r'\b', '*' * len(word), text, flags=re.IGNORECASE)
     return text
 
+# Trusted read utility functions
+# Documents in the database were validated when they were written, so reads
+# rebuild models with model_construct instead of running the validators again.
+def trusted_model(model: type, document: dict):
+    """Build a model from a stored document without validation (extra keys like _id are dropped)"""
+    return model.model_construct(**document)
+
+def trusted_dump(model: type, document: dict) -> dict:
+    return trusted_model(model, document).model_dump(warnings=False)
+
+class TrustedJSONResponse(FastJSONResponse):
+    """JSON response for trusted models/documents.
+
+    Returning a Response from a route skips FastAPI's response_model
+    validation and jsonable_encoder pass over every item.
+    """
+
+def trusted_response(content: Any, response: Optional[Response] = None) -> TrustedJSONResponse:
+    trusted = TrustedJSONResponse(content)
+    if response is not None:
+        # Keep headers set on the injected response (X-Next-Cursor, ETag, ...)
+        trusted.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers if name not in (b"content-length", b"content-type")
+        )
+    return trusted
+
+# Cache utility functions
+class TTLCache:
+    """Bounded in-process cache with per-entry expiry and LRU eviction.
+
+    `on_evict(key)` is called whenever an entry leaves the cache, whether it
+    expired, was evicted or was invalidated.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60, on_evict=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def _evicted(self, key):
+        if self.on_evict is not None:
+            self.on_evict(key)
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+                self._evicted(key)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            self._evicted(evicted)
+
+    def invalidate(self, key):
+        if self._entries.pop(key, None) is not None:
+            self._evicted(key)
+
+    def clear(self):
+        for key in list(self._entries):
+            self.invalidate(key)
+
+    def stats(self) -> Dict:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+def cache_key(namespace: str, *parts) -> str:
+    """Backend key for a namespace and arbitrary key parts, bounded in length"""
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return f"{namespace}:{digest}"
+
+class CacheBackend(ABC):
+    """Async cache shared by every cache in the API.
+
+    Values are plain data (dicts, lists, scalars, datetimes). Tags group keys
+    so related entries can be dropped together, e.g. every cached page of
+    businesses when one business changes. Each invalidation bumps the tag's
+    generation; a write made with expected_generations is skipped when one of
+    them moved, so a result computed before an invalidation is never stored.
+
+    A failing backend behaves as a miss (reads) or a no-op (writes) so a
+    cache outage cannot take the API down.
+    """
+
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: float,
+        tags: List[str] = (),
+        expected_generations: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """Store items; returns False when skipped because a tag's generation moved"""
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        ...
+
+    @abstractmethod
+    async def invalidate_tags(self, *tags: str):
+        ...
+
+    @abstractmethod
+    async def tag_generations(self, tags: List[str]) -> Dict[str, int]:
+        ...
+
+    async def get(self, key: str) -> Any:
+        return (await self.get_many([key])).get(key)
+
+    async def set(self, key: str, value: Any, ttl: float, tags: List[str] = ()):
+        await self.set_many({key: value}, ttl, tags)
+
+    def stats(self) -> Dict:
+        return {}
+
+    async def close(self):
+        pass
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process backend; entries are not shared between workers"""
+
+    def __init__(self, maxsize: int = 10000):
+        self._cache = TTLCache(maxsize=maxsize, on_evict=self._untag)
+        self._tags: Dict[str, set] = {}
+        self._key_tags: Dict[str, set] = {}
+        # Only tags whose generation was asked for are tracked, e.g. list:businesses or
+        # user:{id}. Values come from one counter, so a tag evicted and read again
+        # gets a new generation and a write still holding the old one is skipped.
+        self._generations = TTLCache(maxsize=maxsize, ttl=24 * 60 * 60)
+        self._generation_counter = itertools.count(1)
+
+    def _untag(self, key: str):
+        """Drop an evicted, expired or deleted key from its tags, and empty tags with it"""
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        values = {}
+        for key in keys:
+            value = self._cache.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: float,
+        tags: List[str] = (),
+        expected_generations: Optional[Dict[str, int]] = None
+    ) -> bool:
+        for tag, generation in (expected_generations or {}).items():
+            if self._generations.get(tag) != generation:
+                return False
+        for key, value in items.items():
+            self._cache.set(key, value, ttl)
+            if tags and key in self._cache._entries:
+                self._key_tags.setdefault(key, set()).update(tags)
+                for tag in tags:
+                    self._tags.setdefault(tag, set()).add(key)
+        return True
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._cache.invalidate(key)
+
+    async def invalidate_tags(self, *tags: str):
+        for tag in tags:
+            if self._generations.get(tag) is not None:
+                self._generations.set(tag, next(self._generation_counter))
+            for key in list(self._tags.get(tag, ())):
+                self._cache.invalidate(key)
+
+    async def tag_generations(self, tags: List[str]) -> Dict[str, int]:
+        generations = {}
+        for tag in tags:
+            generation = self._generations.get(tag)
+            if generation is None:
+                generation = next(self._generation_counter)
+                self._generations.set(tag, generation)
+            generations[tag] = generation
+        return generations
+
+    def stats(self) -> Dict:
+        return {"backend": "memory", **self._cache.stats(), "tags": len(self._tags)}
+
+# Stores items only if every tag generation still matches, then adds the keys
+# to their tags (tag sets only ever get a longer TTL, never a shorter one).
+# ARGV: ttl_ms, tag count, (tag key, generation key, expected generation or "") per tag, (key, value) pairs
+REDIS_GUARDED_SET = """
+local ttl = tonumber(ARGV[1])
+local ntags = tonumber(ARGV[2])
+local first = 3 + ntags * 3
+for i = 3, first - 1, 3 do
+    if ARGV[i + 2] ~= '' and (redis.call('GET', ARGV[i + 1]) or '0') ~= ARGV[i + 2] then
+        return 0
+    end
+end
+for i = first, #ARGV, 2 do
+    redis.call('SET', ARGV[i], ARGV[i + 1], 'PX', ttl)
+end
+for i = 3, first - 1, 3 do
+    for j = first, #ARGV, 2 do
+        redis.call('SADD', ARGV[i], ARGV[j])
+    end
+    if redis.call('PTTL', ARGV[i]) < ttl then
+        redis.call('PEXPIRE', ARGV[i], ttl)
+    end
+end
+return 1
+"""
+
+# Bumps a tag's generation and deletes the tag set with every key in it, atomically.
+# ARGV: tag key, generation key, generation TTL in ms
+REDIS_INVALIDATE_TAG = """
+local keys = redis.call('SMEMBERS', ARGV[1])
+redis.call('INCR', ARGV[2])
+redis.call('PEXPIRE', ARGV[2], tonumber(ARGV[3]))
+redis.call('DEL', ARGV[1])
+for i = 1, #keys, 500 do
+    redis.call('DEL', unpack(keys, i, math.min(i + 499, #keys)))
+end
+return #keys
+"""
+
+class RedisCacheBackend(CacheBackend):
+    """Backend on a Redis-protocol server, shared by all workers.
+
+    Values are packed with msgpack; tags are Redis sets of the keys they cover
+    and tag generations are counters, so the stale-write guard holds across
+    workers. Redis errors and timeouts are logged and treated as misses.
+    """
+
+    GENERATION_TTL_MS = 24 * 60 * 60 * 1000
+
+    def __init__(self, url: str, prefix: str = "tdt:", timeout: float = 0.5):
+        import msgpack
+        import redis.asyncio as redis
+        from redis.exceptions import RedisError
+        
+        self._msgpack = msgpack
+        self._redis = redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._errors = (RedisError, OSError, asyncio.TimeoutError)
+        self._guarded_set = self._redis.register_script(REDIS_GUARDED_SET)
+        self._invalidate_tag = self._redis.register_script(REDIS_INVALIDATE_TAG)
+        self._prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _pack(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, default=self._encode, use_bin_type=True)
+
+    def _unpack(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, ext_hook=self._decode, raw=False, strict_map_key=False)
+
+    def _encode(self, value: Any):
+        if isinstance(value, datetime):
+            return self._msgpack.ExtType(1, value.isoformat().encode('utf-8'))
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, (set, tuple)):
+            return list(value)
+        raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+    def _decode(self, code: int, data: bytes):
+        if code == 1:
+            return datetime.fromisoformat(data.decode('utf-8'))
+        return self._msgpack.ExtType(code, data)
+
+    def _tag_key(self, tag: str) -> str:
+        return self._prefix + "tag:" + tag
+
+    def _generation_key(self, tag: str) -> str:
+        return self._prefix + "gen:" + tag
+
+    def _failed(self, operation: str, error: Exception):
+        self.errors += 1
+        logger.warning(f"Redis cache {operation} failed, continuing without cache: {str(error) or type(error).__name__}")
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        try:
+            rows = await self._redis.mget([self._prefix + key for key in keys])
+        except self._errors as e:
+            self._failed("read", e)
+            self.misses += len(keys)
+            return {}
+        values = {}
+        for key, data in zip(keys, rows):
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                values[key] = self._unpack(data)
+        return values
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: float,
+        tags: List[str] = (),
+        expected_generations: Optional[Dict[str, int]] = None
+    ) -> bool:
+        if not items:
+            return True
+        expected_generations = expected_generations or {}
+        args = [max(1, int(ttl * 1000)), len(tags)]
+        for tag in tags:
+            expected = expected_generations.get(tag)
+            args += [self._tag_key(tag), self._generation_key(tag), "" if expected is None else str(expected)]
+        for key, value in items.items():
+            args += [self._prefix + key, self._pack(value)]
+        try:
+            return bool(await self._guarded_set(keys=[], args=args))
+        except self._errors as e:
+            self._failed("write", e)
+            return False
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            await self._redis.delete(*[self._prefix + key for key in keys])
+        except self._errors as e:
+            self._failed("delete", e)
+
+    async def invalidate_tags(self, *tags: str):
+        for tag in tags:
+            try:
+                await self._invalidate_tag(keys=[], args=[self._tag_key(tag), self._generation_key(tag), self.GENERATION_TTL_MS])
+            except self._errors as e:
+                self._failed("invalidation", e)
+
+    async def tag_generations(self, tags: List[str]) -> Dict[str, int]:
+        try:
+            values = await self._redis.mget([self._generation_key(tag) for tag in tags])
+        except self._errors as e:
+            self._failed("read", e)
+            # Can never match, so a guarded write made with it is skipped
+            return {tag: -1 for tag in tags}
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    def stats(self) -> Dict:
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+    async def close(self):
+        await self._redis.aclose()
+
+def create_cache_backend() -> CacheBackend:
+    backend = os.environ.get('CACHE_BACKEND', 'memory')
+    if backend == "redis":
+        return RedisCacheBackend(
+            os.environ.get('CACHE_URL', 'redis://localhost:6379/0'),
+            timeout=float(os.environ.get('CACHE_TIMEOUT', 0.5))
+        )
+    return MemoryCacheBackend(int(os.environ.get('CACHE_MEMORY_SIZE', 10000)))
+
+cache_backend = create_cache_backend()
+
+class ResponseCache:
+    """Listing cache with stale-while-revalidate and single-flight recomputation.
+
+    Entries are fresh for `ttl` seconds and then served stale for up to
+    `stale_ttl` more while one background task refreshes them. Concurrent
+    misses on the same key in a worker await a single shared computation.
+    """
+
+    def __init__(self, namespace: str, ttl: float, stale_ttl: float):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get_or_compute(self, key, compute):
+        key = cache_key(f"list:{self.namespace}", *key)
+        entry = await cache_backend.get(key)
+        if entry is not None and time.time() < entry["fresh_until"]:
+            self.hits += 1
+            return entry["value"]
+        
+        if entry is not None:
+            self.stale_hits += 1
+            if key not in self._inflight:
+                self._refresh(key, compute)
+            return entry["value"]
+        
+        self.misses += 1
+        task = self._inflight.get(key) or self._refresh(key, compute)
+        # Shielded so a disconnecting client doesn't cancel the shared computation
+        return await asyncio.shield(task)
+
+    def _refresh(self, key: str, compute) -> asyncio.Task:
+        tag = f"list:{self.namespace}"
+        
+        async def run():
+            try:
+                generations = await cache_backend.tag_generations([tag])
+                value = await compute()
+                # Skipped if any worker invalidated the tag while this was computing
+                entry = {"value": value, "fresh_until": time.time() + self.ttl}
+                await cache_backend.set_many({key: entry}, self.ttl + self.stale_ttl, [tag], expected_generations=generations)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+        
+        task = asyncio.ensure_future(run())
+        task.add_done_callback(self._log_failure)
+        self._inflight[key] = task
+        return task
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        # HTTPExceptions are client errors already answered by the awaiting request
+        if not task.cancelled() and task.exception() and not isinstance(task.exception(), HTTPException):
+            logger.error(f"Response cache refresh failed: {str(task.exception())}")
+
+    async def clear(self):
+        await cache_backend.invalidate_tags(f"list:{self.namespace}")
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "inflight": len(self._inflight)
+        }
+
+MAX_PAGE_SIZE = 100
+LIST_CACHE_TTL = float(os.environ.get('LIST_CACHE_TTL', 15))
+LIST_CACHE_STALE_TTL = float(os.environ.get('LIST_CACHE_STALE_TTL', 60))
+business_list_cache = ResponseCache("businesses", ttl=LIST_CACHE_TTL, stale_ttl=LIST_CACHE_STALE_TTL)
+event_list_cache = ResponseCache("events", ttl=LIST_CACHE_TTL, stale_ttl=LIST_CACHE_STALE_TTL)
+
+def projection_key(projection: Optional[Dict]) -> tuple:
+    """Cache key part for a projection, independent of the order fields were requested in"""
+    return tuple(sorted(projection)) if projection else ("all",)
+
+FACET_CACHE_TTL = 30
+
+# Detail lookups rarely change; every write path calls invalidate_detail
+DETAIL_CACHE_TTL = float(os.environ.get('DETAIL_CACHE_TTL', 300))
+
+async def cached_detail(kind: str, model: type, document_id: str):
+    data = await cache_backend.get(f"detail:{kind}:{document_id}")
+    # Cached data was dumped from a validated model, so it is rebuilt without validation
+    return model.model_construct(**data) if data is not None else None
+
+async def load_detail(kind: str, collection, model: type, document_id: str):
+    document = await collection.find_one({"id": document_id})
+    if document is None:
+        return None
+    item = trusted_model(model, document)
+    await cache_backend.set(f"detail:{kind}:{document_id}", item.model_dump(warnings=False), DETAIL_CACHE_TTL)
+    return item
+
+async def get_cached_detail(kind: str, collection, model: type, document_id: str):
+    """Read-through lookup of a model by id, e.g. ("business", id)"""
+    return await cached_detail(kind, model, document_id) or await load_detail(kind, collection, model, document_id)
+
+async def invalidate_detail(kind: str, document_id: str):
+    await cache_backend.delete(f"detail:{kind}:{document_id}")
+    if kind == "business":
+        await business_list_cache.clear()
+    elif kind == "event":
+        await event_list_cache.clear()
+
+async def facet_counts(collection, base: Dict, filters: Dict[str, Dict]) -> Dict:
+    """Count documents per value of each facet field in one aggregation.
+
+    `filters` maps each facet field to its own match clause (empty when the
+    field is not filtered). Every facet applies the other facets' filters but
+    not its own, so the counts show what selecting another value would return.
+    """
+    facets = {}
+    for field in filters:
+        match = {}
+        for other, clause in filters.items():
+            if other != field:
+                match.update(clause)
+        facets[field] = [
+            {"$match": match},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}}
+        ]
+    facets["total"] = [{"$match": {k: v for clause in filters.values() for k, v in clause.items()}}, {"$count": "count"}]
+    
+    result = await collection.aggregate([{"$match": base}, {"$facet": facets}]).to_list(1)
+    counts = result[0] if result else {}
+    response = {field: {str(row["_id"]): row["count"] for row in counts.get(field, [])} for field in filters}
+    response["total"] = counts["total"][0]["count"] if counts.get("total") else 0
+    return response
+
+# Resolved users keyed by (user id, token signature), tagged by user id; see invalidate_user
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 60))
+
+async def invalidate_user(user_id: str):
+    """Drop cached sessions of a user after a change to role, verification or active state"""
+    await cache_backend.invalidate_tags(f"user:{user_id}")
+
+# Conditional request utility functions
+def resource_etag(*parts) -> str:
+    return '"' + hashlib.sha1("|".join(str(part) for part in parts).encode('utf-8')).hexdigest() + '"'
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+    if "if-none-match" in request.headers:
+        return etag_matches(request, etag)
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return last_modified.replace(microsecond=0) <= since
+
+def conditional_response(request: Request, response: Response, etag: str, last_modified: Optional[datetime]) -> Optional[Response]:
+    """Set ETag/Last-Modified on `response`, or return the 304 to send instead"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def page_validators(
+    kind: str,
+    request: Request,
+    items: List,
+    stamp_field: str = "updated_at",
+    fallback_field: Optional[str] = None
+) -> Optional[tuple]:
+    """ETag and Last-Modified of a list page, from each item's id and timestamp.
+
+    fallback_field is used for items that have never set stamp_field.
+    """
+    stamps = []
+    for item in items:
+        if not isinstance(item, dict):
+            item = item.__dict__
+        stamp = item.get(stamp_field)
+        if stamp is None and fallback_field:
+            stamp = item.get(fallback_field)
+        stamps.append((item.get("id"), stamp))
+    if any(stamp is None for _, stamp in stamps):
+        return None
+    return resource_etag(kind, request.url.query, *stamps), max((stamp for _, stamp in stamps), default=None)
+
+async def get_conditional_detail(request: Request, response: Response, kind: str, collection, model: type, document_id: str, active_only: bool = False):
+    """get_cached_detail with ETag/Last-Modified derived from updated_at.
+
+    Returns a 304 Response when the client's copy is current, otherwise the
+    item as a TrustedJSONResponse. On a cache miss the check runs against an
+    updated_at-only projection before the full document is loaded.
+    """
+    item = await cached_detail(kind, model, document_id)
+    if item is None:
+        if is_conditional(request):
+            stamp = await collection.find_one({"id": document_id}, {"_id": 0, "updated_at": 1, "is_active": 1})
+            if stamp and stamp.get("updated_at") and stamp.get("is_active", True):
+                etag = resource_etag(kind, document_id, stamp["updated_at"])
+                if is_not_modified(request, etag, stamp["updated_at"]):
+                    return conditional_response(request, response, etag, stamp["updated_at"])
+        
+        item = await load_detail(kind, collection, model, document_id)
+        if item is None:
+            return None
+    if active_only and not item.is_active:
+        return None
+    return (
+        conditional_response(request, response, resource_etag(kind, document_id, item.updated_at), item.updated_at)
+        or trusted_response(item, response)
+    )
+
+# Sparse fieldset utility functions
+# Compact "card" projections used by list endpoints unless fields= asks otherwise
+BUSINESS_CARD_PROJECTION = {
+    field: 1 for field in [
+        "id", "user_id", "business_name", "description", "category", "island", "address",
+        "latitude", "longitude", "logo", "profile_photo", "cover_photo", "rating_average", "rating_count",
+        "accepts_appointments", "status", "updated_at"
+    ]
+}
+
+EVENT_CARD_PROJECTION = {
+    field: 1 for field in [
+        "id", "title", "description", "category", "island", "location", "event_date",
+        "start_time", "end_time", "organizer_name", "ticket_price", "ticket_link",
+        "event_image", "updated_at"
+    ]
+}
+
+APARTMENT_CARD_PROJECTION = {
+    **{
+        field: 1 for field in [
+            "id", "title", "description", "island", "bedrooms", "bathrooms", "monthly_rent",
+            "currency", "property_type", "furnishing", "amenities", "available_date",
+            "contact_name", "contact_email", "contact_phone", "created_at", "updated_at"
+        ]
+    },
+    "photos": {"$slice": 1}  # Cards only show the first photo
+}
+
+def build_projection(fields: Optional[str], model: type, card_projection: Dict) -> Optional[Dict]:
+    """Translate a fields= parameter into a Mongo projection.
+
+    No value selects the card projection, "all" returns None for the full
+    document, anything else is a comma separated list of model fields.
+    """
+    if fields == "all":
+        return None
+    
+    if fields is None:
+        projection = dict(card_projection)
+    else:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in model.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        projection = {field: 1 for field in requested}
+    
+    projection["id"] = 1
+    projection["_id"] = 0
+    return projection
+
+# Cursor pagination utility functions
+BUSINESS_SORT = [("created_at", -1), ("id", -1)]
+EVENT_SORT = [("event_date", 1), ("id", 1)]
+APARTMENT_SORT = [("created_at", -1), ("id", -1)]
+REVIEW_SORT = [("created_at", -1), ("id", -1)]
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort key of the last document on a page as an opaque token"""
+    payload = [{"$date": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    token = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode('utf-8'))
+    return token.decode('utf-8').rstrip("=")
+
+def decode_cursor(cursor: str, length: int) -> List[Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = [datetime.fromisoformat(value["$date"]) if isinstance(value, dict) else value for value in payload]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(values) != length:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def keyset_query(sort: List[tuple], values: List[Any]) -> Dict:
+    """Match documents strictly after `values` in `sort` order"""
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev_field: prev_value for (prev_field, _), prev_value in zip(sort[:i], values[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+async def fetch_page(
+    collection,
+    query: Dict,
+    sort: List[tuple],
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+    projection: Optional[Dict] = None
+) -> tuple:
+    """Fetch one page, by keyset when a cursor is given and by skip otherwise.
+
+    Returns the documents and the cursor of the next page, which is None
+    unless the page is full.
+    """
+    if cursor:
+        query = {"$and": [query, keyset_query(sort, decode_cursor(cursor, len(sort)))]}
+        skip = 0
+    added = []
+    if projection:
+        # The sort key has to come back to build the next cursor, but isn't returned
+        added = [field for field, _ in sort if field not in projection]
+        projection = {**projection, **{field: 1 for field in added}}
+    
+    documents = await collection.find(query, projection).sort(sort).skip(skip).limit(limit).to_list(limit)
+    next_cursor = None
+    if limit and len(documents) == limit:
+        next_cursor = encode_cursor([documents[-1].get(field) for field, _ in sort])
+    for document in documents:
+        for field in added:
+            document.pop(field, None)
+    return documents, next_cursor
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+async def paginate(
+    collection,
+    query: Dict,
+    sort: List[tuple],
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+    response: Response,
+    projection: Optional[Dict] = None
+) -> List[dict]:
+    """fetch_page, returning the next page's token in the X-Next-Cursor header"""
+    documents, next_cursor = await fetch_page(collection, query, sort, cursor, skip, limit, projection)
+    set_next_cursor(response, next_cursor)
+    return documents
+
+# Export utility functions
+# Collections that can be exported, with the model whose fields become CSV columns
+EXPORT_COLLECTIONS = {
+    "businesses": BusinessProfile,
+    "events": Event,
+    "apartments": ApartmentListing,
+}
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+EXPORT_CHUNK_SIZE = 64 * 1024  # bytes buffered before a chunk is sent
+
+def export_csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return encode_json(value).decode("utf-8")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+async def export_rows(collection, columns: List[str], format: str):
+    """Encode every document of a collection as NDJSON lines or CSV rows.
+
+    Reads one Motor cursor in batches of EXPORT_BATCH_SIZE, so memory stays
+    flat whatever the collection size.
+    """
+    cursor = collection.find({}, {"_id": 0}).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    if format == "ndjson":
+        async for document in cursor:
+            yield encode_json(document) + b"\n"
+        return
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for document in cursor:
+        writer.writerow([export_csv_value(document.get(column)) for column in columns])
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+async def export_stream(rows, compress: bool):
+    """Group rows into ~EXPORT_CHUNK_SIZE chunks, gzip-compressing them incrementally if asked"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits=31 writes a gzip header
+    pending, size = [], 0
+    async for row in rows:
+        pending.append(row)
+        size += len(row)
+        if size < EXPORT_CHUNK_SIZE:
+            continue
+        chunk = b"".join(pending)
+        pending, size = [], 0
+        chunk = compressor.compress(chunk) if compressor else chunk
+        if chunk:
+            yield chunk
+    
+    chunk = b"".join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+# Compression utility functions
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/", "application/javascript", "image/svg+xml")
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}, e.g. "br;q=1.0, gzip;q=0.8" -> {"br": 1.0, "gzip": 0.8}"""
+    codings = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            codings[coding.strip().lower()] = q
+    return codings
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses with brotli or gzip.
+
+    Only bodies sent in a single message are compressed; streamed responses
+    (more_body=True, e.g. exports) and responses that already carry a
+    Content-Encoding pass through untouched, as do paths in excluded_paths.
+    Bodies under minimum_size are not worth the CPU and are sent as-is.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4, excluded_paths: tuple = ()):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_paths = excluded_paths
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        self.brotli = brotli
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        codings = parse_accept_encoding(accept_encoding)
+        wildcard = codings.get("*", 0.0)
+        candidates = ["br", "gzip"] if self.brotli else ["gzip"]
+        best, best_q = None, 0.0
+        for coding in candidates:
+            q = codings.get(coding, wildcard)
+            if q > best_q:
+                best, best_q = coding, q
+        return best
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return self.brotli.compress(body, quality=self.brotli_quality)
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+        
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoding = self.choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        passthrough = False
+        
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                content_type = headers.get("content-type", "")
+                body = message.get("body", b"")
+                if (
+                    message.get("more_body", False)
+                    or "content-encoding" in headers
+                    or len(body) < self.minimum_size
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+                
+                body = self.compress(encoding, body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The encoded bytes differ, so the representation's validator becomes weak
+                    headers["ETag"] = f"W/{etag}"
+                await send(start_message)
+                start_message = None
+                await send({"type": "http.response.body", "body": body})
+                return
+            
+            await send(message)
+        
+        await self.app(scope, receive, send_compressed)
+
 # File upload utility functions
 ALLOWED_IMAGE_TYPES = ['image/jpeg', 'image/png', 'image/webp', 'image/jpg']
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
@@ -701,6 +1964,18 @@ def validate_image_file(file: UploadFile):
     
     return file_size
 
+# The Cloudinary SDK makes blocking HTTP calls, so they run on a dedicated executor
+CLOUDINARY_MAX_CONCURRENCY = int(os.environ.get('CLOUDINARY_MAX_CONCURRENCY', '8'))  # calls in flight process-wide
+CLOUDINARY_UPLOADS_PER_REQUEST = int(os.environ.get('CLOUDINARY_UPLOADS_PER_REQUEST', '3'))
+cloudinary_executor = ThreadPoolExecutor(max_workers=CLOUDINARY_MAX_CONCURRENCY, thread_name_prefix="cloudinary")
+cloudinary_slots = asyncio.Semaphore(CLOUDINARY_MAX_CONCURRENCY)
+
+async def run_cloudinary(func, *args, **kwargs):
+    """Run a blocking Cloudinary SDK call off the event loop, e.g. run_cloudinary(cloudinary.uploader.destroy, public_id)"""
+    async with cloudinary_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cloudinary_executor, functools.partial(func, *args, **kwargs))
+
 async def upload_to_cloudinary(file: UploadFile, business_id: str) -> PhotoMetadata:
     """Upload image to Cloudinary and return metadata"""
     try:
@@ -719,7 +1994,8 @@ async def upload_to_cloudinary(file: UploadFile, business_id: str) -> PhotoMetad
             )
         
         # Upload with optimization
-        result = cloudinary.uploader.upload(
+        result = await run_cloudinary(
+            cloudinary.uploader.upload,
             file.file,
             folder=f"businesses/{business_id}",
             transformation=[
@@ -753,33 +2029,558 @@ async def upload_to_cloudinary(file: UploadFile, business_id: str) -> PhotoMetad
         logger.error(f"Cloudinary upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
-# Routes
-@api_router.get("/")
-async def root():
-    return {"message": "The Direct Tree - Bahamas Business Directory API"}
+# Business search index
+# Weights rank name > services > category > description, for both the Mongo
+# text index and the in-memory index below
+BUSINESS_TEXT_INDEX_WEIGHTS = {
+    "business_name": 10,
+    "services": 5,
+    "category": 3,
+    "description": 1
+}
 
-@api_router.get("/islands")
-async def get_islands():
-    return {"islands": BAHAMAS_ISLANDS}
+SEARCH_INDEX_ENABLED = os.environ.get('SEARCH_INDEX_ENABLED', 'false').lower() == 'true'
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
 
-@api_router.get("/categories")
-async def get_categories():
-    return {"categories": BUSINESS_CATEGORIES}
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
 
-@api_router.get("/event-categories")
-async def get_event_categories():
-    return {"categories": EVENT_CATEGORIES}
+# The text index uses default_language english: MongoDB drops English stop words
+# and reduces the rest with the Snowball English stemmer. search_terms does the
+# same so the in-memory index matches the same documents as $text.
+ENGLISH_STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no nor
+not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these
+they this those through to too under until up very was we were what when where
+which while who whom why will with would you your yours yourself yourselves
+""".split())
 
-# Authentication Routes
-@api_router.post("/register")
-async def register(user_data: UserCreate, background_tasks: BackgroundTasks):
-    # Check if user exists
-    existing_user = await db.users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
+try:
+    import snowballstemmer
+    english_stemmer = snowballstemmer.stemmer("english")
+except ImportError:
+    english_stemmer = None
+
+def search_terms(text: str) -> List[str]:
+    """Index terms of `text` as the english $text index sees them"""
+    words = [word for word in tokenize(text) if word not in ENGLISH_STOP_WORDS]
+    return english_stemmer.stemWords(words) if english_stemmer else words
+
+class BusinessSearchIndex:
+    """In-memory inverted index over approved businesses.
+
+    Every business gets an integer slot. Posting lists map term -> {slot: weight}
+    and island/category filters are int bitsets over those slots. Terms come
+    from search_terms, so matches are the same as the english $text index;
+    scores use BUSINESS_TEXT_INDEX_WEIGHTS but not Mongo's term-frequency
+    scaling, so only the order is comparable.
+    """
+
+    def __init__(self, weights: Dict[str, int]):
+        self.weights = weights
+        self.ready = False
+        self._clear()
+
+    def _clear(self):
+        self._slots: Dict[str, int] = {}        # business id -> slot
+        self._docs: Dict[int, dict] = {}        # slot -> serialized BusinessProfile
+        self._object_ids: Dict[Any, str] = {}   # mongo _id -> business id, for delete events
+        self._tokens: Dict[int, List[str]] = {} # slot -> tokens posted for it
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._islands: Dict[str, int] = {}
+        self._categories: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._next_slot = 0
+        self._all = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _doc_weights(self, doc: dict) -> Dict[str, int]:
+        token_weights: Dict[str, int] = {}
+        for field, weight in self.weights.items():
+            value = doc.get(field) or ""
+            if isinstance(value, list):
+                value = " ".join(value)
+            for token in search_terms(value):
+                token_weights[token] = token_weights.get(token, 0) + weight
+        return token_weights
+
+    def upsert(self, doc: dict):
+        self.remove(doc["id"])
+        if doc.get("status") != BusinessStatus.APPROVED:
+            return
+        
+        try:
+            profile = trusted_dump(BusinessProfile, doc)
+        except Exception as e:
+            logger.error(f"Skipping business {doc['id']} in search index: {str(e)}")
+            return
+        
+        slot = self._free_slots.pop() if self._free_slots else self._next_slot
+        if slot == self._next_slot:
+            self._next_slot += 1
+        bit = 1 << slot
+        
+        self._slots[doc["id"]] = slot
+        self._docs[slot] = profile
+        if "_id" in doc:
+            self._object_ids[doc["_id"]] = doc["id"]
+        
+        token_weights = self._doc_weights(doc)
+        self._tokens[slot] = list(token_weights)
+        for token, weight in token_weights.items():
+            self._postings.setdefault(token, {})[slot] = weight
+        
+        self._islands[doc["island"]] = self._islands.get(doc["island"], 0) | bit
+        self._categories[doc["category"]] = self._categories.get(doc["category"], 0) | bit
+        self._all |= bit
+
+    def remove(self, business_id: str):
+        slot = self._slots.pop(business_id, None)
+        if slot is None:
+            return
+        
+        doc = self._docs.pop(slot)
+        bit = 1 << slot
+        for token in self._tokens.pop(slot):
+            posting = self._postings[token]
+            posting.pop(slot, None)
+            if not posting:
+                del self._postings[token]
+        
+        self._islands[doc["island"]] &= ~bit
+        self._categories[doc["category"]] &= ~bit
+        self._all &= ~bit
+        self._free_slots.append(slot)
+
+    def apply_change(self, change: dict) -> Optional[str]:
+        """Apply one change stream event from db.businesses; returns the business id if it was dropped"""
+        operation = change["operationType"]
+        if operation in ("insert", "update", "replace") and change.get("fullDocument"):
+            self.upsert(change["fullDocument"])
+        elif operation in ("insert", "update", "replace", "delete"):
+            # Deleted, or gone before the update could be looked up
+            business_id = self._object_ids.pop(change["documentKey"]["_id"], None)
+            if business_id:
+                self.remove(business_id)
+            return business_id
+        return None
+
+    async def rebuild(self):
+        self._clear()
+        async for business in db.businesses.find({"status": BusinessStatus.APPROVED}):
+            self.upsert(business)
+        self.ready = True
+        logger.info(f"Business search index built with {len(self)} businesses")
+
+    def search(
+        self,
+        q: str,
+        island: Optional[str] = None,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 50,
+        projection: Optional[Dict] = None
+    ) -> List[dict]:
+        mask = self._all
+        if island:
+            mask &= self._islands.get(island, 0)
+        if category:
+            mask &= self._categories.get(category, 0)
+        if not mask:
+            return []
+        
+        tokens = set(search_terms(q))
+        if not tokenize(q):
+            ranked = [(slot, 0) for slot in sorted(self._docs) if mask >> slot & 1]
+        elif not tokens:
+            # Only stop words, which $text never matches
+            return []
+        else:
+            scores: Dict[int, int] = {}
+            for token in tokens:
+                for slot, weight in self._postings.get(token, {}).items():
+                    if mask >> slot & 1:
+                        scores[slot] = scores.get(slot, 0) + weight
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        
+        results = []
+        for slot, score in ranked[skip:skip + limit]:
+            doc = self._docs[slot]
+            if projection:
+                doc = {field: doc[field] for field in projection if field in doc}
+            results.append({**doc, "score": float(score)})
+        return results
+
+business_search_index = BusinessSearchIndex(BUSINESS_TEXT_INDEX_WEIGHTS)
+
+# Typeahead suggestions
+class SuggestIndex:
+    """Sorted array of normalized terms answering prefix lookups with bisect.
+
+    Terms are business names, services and BUSINESS_CATEGORIES. Every word
+    start inside a term is a key too, so "div" finds "Island Diving".
+    """
+
+    MAX_SCAN = 500
+
+    def __init__(self):
+        self._keys: List[tuple] = []            # sorted (key, term) pairs
+        self._terms: Dict[str, dict] = {}       # term -> {"text", "type", "sources"}
+        self._business_terms: Dict[str, List[str]] = {}
+
+    @staticmethod
+    def _term_keys(term: str) -> set:
+        words = term.split(" ")
+        return {" ".join(words[i:]) for i in range(len(words))}
+
+    def _add_term(self, text: str, term_type: str, source: str, pending: Optional[List[tuple]] = None) -> Optional[str]:
+        """Add a term for source; new keys go to `pending` instead of _keys during a bulk load"""
+        term = " ".join(tokenize(text))
+        if not term:
+            return None
+        entry = self._terms.get(term)
+        if entry is None:
+            entry = self._terms[term] = {"text": text.strip(), "type": term_type, "sources": set()}
+            for key in self._term_keys(term):
+                if pending is None:
+                    bisect.insort(self._keys, (key, term))
+                else:
+                    pending.append((key, term))
+        entry["sources"].add(source)
+        return term
+
+    def _remove_term_source(self, term: str, source: str):
+        entry = self._terms.get(term)
+        if entry is None:
+            return
+        entry["sources"].discard(source)
+        if entry["sources"]:
+            return
+        del self._terms[term]
+        for key in self._term_keys(term):
+            i = bisect.bisect_left(self._keys, (key, term))
+            if i < len(self._keys) and self._keys[i] == (key, term):
+                del self._keys[i]
+
+    def add_categories(self, categories: List[str], pending: Optional[List[tuple]] = None):
+        for category in categories:
+            self._add_term(category, "category", "categories", pending)
+
+    def add_business(self, doc: dict, pending: Optional[List[tuple]] = None):
+        self.remove_business(doc["id"])
+        if doc.get("status") != BusinessStatus.APPROVED:
+            return
+        
+        terms = [self._add_term(doc["business_name"], "business", doc["id"], pending)]
+        for service in doc.get("services") or []:
+            terms.append(self._add_term(service, "service", doc["id"], pending))
+        self._business_terms[doc["id"]] = [term for term in terms if term]
+
+    def remove_business(self, business_id: str):
+        for term in self._business_terms.pop(business_id, []):
+            self._remove_term_source(term, business_id)
+
+    def load(self, docs: List[dict]):
+        """Replace the index with BUSINESS_CATEGORIES and docs, sorting the keys once"""
+        self._keys, self._terms, self._business_terms = [], {}, {}
+        pending: List[tuple] = []
+        self.add_categories(BUSINESS_CATEGORIES, pending)
+        for doc in docs:
+            self.add_business(doc, pending)
+        pending.sort()
+        self._keys = pending
+
+    def clear(self):
+        self.load([])
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        prefix = " ".join(tokenize(prefix))
+        if not prefix:
+            return []
+        
+        # Terms matching at their start rank first, then the ones used by most businesses
+        matches: Dict[str, bool] = {}
+        start = bisect.bisect_left(self._keys, (prefix,))
+        for key, term in self._keys[start:start + self.MAX_SCAN]:
+            if not key.startswith(prefix):
+                break
+            matches[term] = matches.get(term, False) or key == term
+        
+        ranked = sorted(
+            matches.items(),
+            key=lambda item: (not item[1], -len(self._terms[item[0]]["sources"]), item[0])
+        )
+        return [
+            {"text": self._terms[term]["text"], "type": self._terms[term]["type"]}
+            for term, _ in ranked[:limit]
+        ]
+
+suggest_index = SuggestIndex()
+
+# Fuzzy search
+class TrigramIndex:
+    """Trigram index over the words of business names, services and categories.
+
+    A query word matches every indexed word whose trigram Jaccard similarity
+    reaches the threshold, so "resturant" still finds "restaurant".
+    """
+
+    def __init__(self, threshold: float = 0.3):
+        self.threshold = threshold
+        self.ready = False  # set once rebuild_business_indexes has loaded it
+        self.clear()
+
+    def clear(self):
+        self._trigrams: Dict[str, set] = {}         # trigram -> words
+        self._words: Dict[str, set] = {}            # word -> business ids
+        self._gram_counts: Dict[str, int] = {}      # word -> number of trigrams
+        self._business_words: Dict[str, set] = {}
+
+    @staticmethod
+    def trigrams(word: str) -> set:
+        padded = f"  {word} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add_business(self, doc: dict):
+        self.remove_business(doc["id"])
+        if doc.get("status") != BusinessStatus.APPROVED:
+            return
+        
+        text = " ".join([doc["business_name"], doc.get("category") or ""] + (doc.get("services") or []))
+        words = set(tokenize(text))
+        for word in words:
+            if word not in self._words:
+                self._words[word] = set()
+                grams = self.trigrams(word)
+                self._gram_counts[word] = len(grams)
+                for gram in grams:
+                    self._trigrams.setdefault(gram, set()).add(word)
+            self._words[word].add(doc["id"])
+        self._business_words[doc["id"]] = words
+
+    def remove_business(self, business_id: str):
+        for word in self._business_words.pop(business_id, set()):
+            businesses = self._words[word]
+            businesses.discard(business_id)
+            if businesses:
+                continue
+            del self._words[word]
+            del self._gram_counts[word]
+            for gram in self.trigrams(word):
+                words = self._trigrams[gram]
+                words.discard(word)
+                if not words:
+                    del self._trigrams[gram]
+
+    def match(self, q: str) -> Dict[str, float]:
+        """Score businesses by the summed best similarity of each query word"""
+        scores: Dict[str, float] = {}
+        for token in set(tokenize(q)):
+            grams = self.trigrams(token)
+            shared: Dict[str, int] = {}
+            for gram in grams:
+                for word in self._trigrams.get(gram, ()):
+                    shared[word] = shared.get(word, 0) + 1
+            
+            best: Dict[str, float] = {}
+            for word, count in shared.items():
+                similarity = count / (len(grams) + self._gram_counts[word] - count)
+                if similarity < self.threshold:
+                    continue
+                for business_id in self._words[word]:
+                    if similarity > best.get(business_id, 0.0):
+                        best[business_id] = similarity
+            
+            for business_id, similarity in best.items():
+                scores[business_id] = scores.get(business_id, 0.0) + similarity
+        return scores
+
+fuzzy_index = TrigramIndex()
+FUZZY_MAX_CANDIDATES = 1000
+
+# The suggest and fuzzy indexes live in each worker. A change stream keeps them
+# current; without one (no replica set) workers poll BUSINESS_INDEX_TAG's
+# generation, bumped on approve/reject, and also rebuild every
+# BUSINESS_INDEX_REBUILD_INTERVAL since the memory cache backend isn't shared.
+BUSINESS_INDEX_TAG = "index:businesses"
+BUSINESS_INDEX_POLL_INTERVAL = int(os.environ.get('BUSINESS_INDEX_POLL_INTERVAL', '30'))  # seconds
+BUSINESS_INDEX_REBUILD_INTERVAL = int(os.environ.get('BUSINESS_INDEX_REBUILD_INTERVAL', '600'))  # seconds
+business_object_ids: Dict[Any, str] = {}  # mongo _id -> business id of indexed businesses, for delete events
+
+def sync_business_indexes(doc: dict):
+    """Add, update or drop a business in the in-process suggest and fuzzy indexes"""
+    suggest_index.add_business(doc)
+    fuzzy_index.add_business(doc)
+    if "_id" in doc and doc.get("status") == BusinessStatus.APPROVED:
+        business_object_ids[doc["_id"]] = doc["id"]
+
+def remove_from_business_indexes(business_id: str):
+    """Drop a deleted business from the in-process suggest and fuzzy indexes"""
+    suggest_index.remove_business(business_id)
+    fuzzy_index.remove_business(business_id)
+
+async def business_indexes_changed(doc: dict):
+    """Apply a business's new status here and tell polling workers to rebuild"""
+    sync_business_indexes(doc)
+    await cache_backend.invalidate_tags(BUSINESS_INDEX_TAG)
+
+async def rebuild_business_indexes():
+    projection = {"_id": 1, "id": 1, "business_name": 1, "category": 1, "services": 1, "status": 1}
+    businesses = await db.businesses.find({"status": BusinessStatus.APPROVED}, projection).to_list(None)
+    suggest_index.load(businesses)
+    fuzzy_index.clear()
+    for business in businesses:
+        fuzzy_index.add_business(business)
+    fuzzy_index.ready = True
+    business_object_ids.clear()
+    business_object_ids.update((business["_id"], business["id"]) for business in businesses)
+
+def apply_business_change(change: dict, search_index: bool):
+    """Apply one change stream event from db.businesses to the in-process indexes"""
+    if change["operationType"] not in ("insert", "update", "replace", "delete"):
+        return
+    if search_index:
+        business_search_index.apply_change(change)
+    document = change.get("fullDocument")
+    if document:
+        sync_business_indexes(document)
+    else:
+        # Deleted, or gone before the update could be looked up
+        business_id = business_object_ids.pop(change["documentKey"]["_id"], None)
+        if business_id:
+            remove_from_business_indexes(business_id)
+
+async def poll_business_indexes():
+    """Rebuild the suggest and fuzzy indexes when BUSINESS_INDEX_TAG moves, or on a timer"""
+    generation, rebuilt_at = None, None
+    while True:
+        try:
+            current = (await cache_backend.tag_generations([BUSINESS_INDEX_TAG]))[BUSINESS_INDEX_TAG]
+            # A negative generation means the backend couldn't be read
+            if (
+                rebuilt_at is None
+                or (current >= 0 and current != generation)
+                or time.monotonic() - rebuilt_at >= BUSINESS_INDEX_REBUILD_INTERVAL
+            ):
+                await rebuild_business_indexes()
+                generation, rebuilt_at = current, time.monotonic()
+        except Exception as e:
+            logger.error(f"Error refreshing suggest and fuzzy indexes: {str(e)}")
+        await asyncio.sleep(BUSINESS_INDEX_POLL_INTERVAL)
+
+async def watch_business_changes(search_index: bool):
+    """Keep the suggest and fuzzy indexes, and business_search_index when
+    search_index is set, in sync with db.businesses via a change stream"""
+    resume_token = None
+    while True:
+        try:
+            async with db.businesses.watch(full_document="updateLookup", resume_after=resume_token) as stream:
+                # Open the cursor before (re)building so no change is missed in between
+                change = await stream.try_next()
+                if resume_token is None:
+                    await rebuild_business_indexes()
+                    if search_index:
+                        await business_search_index.rebuild()
+                while True:
+                    if change is not None:
+                        apply_business_change(change, search_index)
+                    resume_token = stream.resume_token
+                    change = await stream.next()
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            # Change streams need a replica set; serve search from Mongo and poll for suggest/fuzzy changes
+            business_search_index.ready = False
+            logger.error(f"Business change stream unavailable, polling for index changes instead: {str(e)}")
+            await poll_business_indexes()
+            return
+        except Exception as e:
+            logger.error(f"Business change stream error: {str(e)}")
+            await asyncio.sleep(5)
+
+# Precomputed reference data responses
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match covers `etag`"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+class PrecomputedJSON:
+    """JSON body encoded once at startup and served with a strong ETag"""
+
+    def __init__(self, content, max_age: int = 86400):
+        self.body = json.dumps(content, separators=(",", ":")).encode('utf-8')
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.cache_control = f"public, max-age={max_age}"
+
+    def response(self, request: Request, cache_control: Optional[str] = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": cache_control or self.cache_control}
+        if etag_matches(request, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+REFERENCE_DATA_VERSION = hashlib.sha256(
+    json.dumps([BAHAMAS_ISLANDS, BUSINESS_CATEGORIES, EVENT_CATEGORIES]).encode('utf-8')
+).hexdigest()[:12]
+
+ISLANDS_RESPONSE = PrecomputedJSON({"islands": BAHAMAS_ISLANDS})
+CATEGORIES_RESPONSE = PrecomputedJSON({"categories": BUSINESS_CATEGORIES})
+EVENT_CATEGORIES_RESPONSE = PrecomputedJSON({"categories": EVENT_CATEGORIES})
+REFERENCE_DATA_RESPONSE = PrecomputedJSON({
+    "version": REFERENCE_DATA_VERSION,
+    "islands": BAHAMAS_ISLANDS,
+    "categories": BUSINESS_CATEGORIES,
+    "event_categories": EVENT_CATEGORIES
+})
+
+# Routes
+@api_router.get("/")
+async def root():
+    return {"message": "The Direct Tree - Bahamas Business Directory API"}
+
+@api_router.get("/islands")
+async def get_islands(request: Request):
+    return ISLANDS_RESPONSE.response(request)
+
+@api_router.get("/categories")
+async def get_categories(request: Request):
+    return CATEGORIES_RESPONSE.response(request)
+
+@api_router.get("/event-categories")
+async def get_event_categories(request: Request):
+    return EVENT_CATEGORIES_RESPONSE.response(request)
+
+@api_router.get("/reference-data")
+async def get_reference_data(request: Request, v: Optional[str] = None):
+    """Islands, business categories and event categories in one response.
+
+    Clients that request ?v=<version> get an immutable, year-long cache entry;
+    the version changes whenever any of the lists does.
+    """
+    if v == REFERENCE_DATA_VERSION:
+        return REFERENCE_DATA_RESPONSE.response(request, "public, max-age=31536000, immutable")
+    return REFERENCE_DATA_RESPONSE.response(request)
+
+# Authentication Routes
+@api_router.post("/register")
+async def register(user_data: UserCreate, background_tasks: BackgroundTasks):
+    # Check if user exists
+    existing_user = await db.users.find_one({"email": user_data.email})
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    
     # Hash password
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     
     # Generate verification token
     verification_token = generate_verification_token()
@@ -826,6 +2627,7 @@ async def verify_email(verification: EmailVerification, background_tasks: Backgr
             }
         }
     )
+    await invalidate_user(user.id)
     
     # Send welcome email
     background_tasks.add_task(
@@ -863,9 +2665,17 @@ async def login(login_data: UserLogin):
         raise HTTPException(status_code=401, detail="Please verify your email before logging in")
     
     # Verify password
-    if not verify_password(login_data.password, user.password):
+    if not await verify_password(login_data.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    # Upgrade the stored hash when BCRYPT_ROUNDS has changed since it was made
+    if password_hasher.needs_rehash(user.password):
+        await db.users.update_one(
+            {"id": user.id, "password": user.password},
+            {"$set": {"password": await hash_password(login_data.password)}}
+        )
+        password_hasher.metrics["rehashed"] += 1
+    
     # Create JWT token
     token = create_jwt_token(user.id, user.role.value)
     
@@ -912,40 +2722,168 @@ async def resend_verification(email: EmailStr, background_tasks: BackgroundTasks
     return {"message": "Verification email sent"}
 
 # Business Routes
+def business_regex_filter(q: str) -> List[Dict]:
+    """Case-insensitive substring match on the searchable business fields"""
+    search_pattern = {"$regex": re.escape(q), "$options": "i"}
+    return [
+        {"business_name": search_pattern},
+        {"description": search_pattern},
+        {"category": search_pattern},
+        {"services": {"$elemMatch": search_pattern}}
+    ]
+
 @api_router.get("/businesses/search")
 async def search_businesses(
     q: str,
     island: Optional[str] = None,
     category: Optional[str] = None,
     status: Optional[str] = "approved",
+    mode: str = "text",
+    fields: Optional[str] = None,
     skip: int = 0,
     limit: int = 50
 ):
-    """Search businesses by name, description, category, or services"""
+    """Search businesses by name, services, category, or description.
+
+    mode=text (default) uses the weighted text index and returns results sorted
+    by relevance with a "score" field; mode=fuzzy matches misspelled words via
+    the trigram index; mode=regex keeps the old substring scan.
+    """
+    if mode not in ("text", "fuzzy", "regex"):
+        raise HTTPException(status_code=400, detail="Invalid search mode. Use 'text', 'fuzzy' or 'regex'")
+    
+    projection = build_projection(fields, BusinessProfile, BUSINESS_CARD_PROJECTION)
     query = {"status": status} if status else {}
     
-    # Add text search conditions
-    search_conditions = []
-    if q:
-        search_pattern = {"$regex": q, "$options": "i"}  # Case-insensitive
-        search_conditions.extend([
-            {"business_name": search_pattern},
-            {"description": search_pattern},
-            {"category": search_pattern},
-            {"services": {"$elemMatch": search_pattern}}
-        ])
+    # Add filters
+    if island:
+        query["island"] = island
+    if category:
+        query["category"] = category
+    
+    q = q.strip()
+    if mode == "regex":
+        if q:
+            query["$or"] = business_regex_filter(q)
+        businesses = await db.businesses.find(query, projection).skip(skip).limit(limit).to_list(limit)
+        if projection:
+            return trusted_response(businesses)
+        return trusted_response([trusted_dump(BusinessProfile, business) for business in businesses])
     
-    if search_conditions:
-        query["$or"] = search_conditions
+    if mode == "fuzzy" and status != BusinessStatus.APPROVED:
+        raise HTTPException(status_code=400, detail="Fuzzy search only covers approved businesses")
     
-    # Add filters
+    # Until this worker has loaded the trigram index, answer fuzzy queries with text search
+    if mode == "fuzzy" and fuzzy_index.ready:
+        scores = fuzzy_index.match(q)
+        ranked = sorted(scores, key=lambda business_id: -scores[business_id])
+        # Island/category filters run in Mongo, so fetch candidates in score order until the page is full
+        businesses = []
+        for start in range(0, len(ranked), FUZZY_MAX_CANDIDATES):
+            candidates = ranked[start:start + FUZZY_MAX_CANDIDATES]
+            matched = await db.businesses.find({**query, "id": {"$in": candidates}}, projection).to_list(len(candidates))
+            businesses.extend(sorted(matched, key=lambda business: -scores[business["id"]]))
+            if len(businesses) >= skip + limit:
+                break
+        businesses = businesses[skip:skip + limit]
+        if projection:
+            return trusted_response([{**business, "score": round(scores[business["id"]], 3)} for business in businesses])
+        return trusted_response([{**trusted_dump(BusinessProfile, business), "score": round(scores[business["id"]], 3)} for business in businesses])
+    
+    if status == BusinessStatus.APPROVED and business_search_index.ready:
+        return trusted_response(business_search_index.search(q, island, category, skip, limit, projection))
+    
+    if not q:
+        businesses = await db.businesses.find(query, projection).skip(skip).limit(limit).to_list(limit)
+        if projection:
+            return trusted_response([{**business, "score": 0.0} for business in businesses])
+        return trusted_response([{**trusted_dump(BusinessProfile, business), "score": 0.0} for business in businesses])
+    
+    score = {"score": {"$meta": "textScore"}}
+    try:
+        businesses = await db.businesses.find({**query, "$text": {"$search": q}}, {**(projection or {}), **score}).sort([("score", {"$meta": "textScore"})]).skip(skip).limit(limit).to_list(limit)
+    except OperationFailure as e:
+        # IndexNotFound: the text index wasn't created (INDEX_SYNC_MODE off/dry-run, or a conflicting index)
+        if e.code != 27:
+            raise
+        logger.warning(f"Business text index missing, using regex search: {str(e)}")
+        businesses = await db.businesses.find({**query, "$or": business_regex_filter(q)}, projection).skip(skip).limit(limit).to_list(limit)
+        businesses = [{**business, "score": 0.0} for business in businesses]
+    if projection:
+        return trusted_response(businesses)
+    return trusted_response([{**trusted_dump(BusinessProfile, business), "score": business["score"]} for business in businesses])
+
+@api_router.get("/businesses/suggest")
+async def suggest_businesses(prefix: str, limit: int = 10):
+    """Typeahead suggestions for business names, services and categories"""
+    return {"suggestions": suggest_index.suggest(prefix, max(1, min(limit, 20)))}
+
+@api_router.get("/businesses/nearby")
+async def get_nearby_businesses(
+    lat: float,
+    lng: float,
+    radius: float = 5.0,
+    island: Optional[str] = None,
+    category: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = 50
+):
+    """Approved businesses within `radius` km of a point, closest first, with distance_km"""
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        raise HTTPException(status_code=400, detail="Invalid coordinates")
+    if radius <= 0:
+        raise HTTPException(status_code=400, detail="Radius must be positive")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    
+    projection = build_projection(fields, BusinessProfile, BUSINESS_CARD_PROJECTION)
+    query = {"status": BusinessStatus.APPROVED}
     if island:
         query["island"] = island
     if category:
         query["category"] = category
     
-    businesses = await db.businesses.find(query).skip(skip).limit(limit).to_list(limit)
-    return [BusinessProfile(**business) for business in businesses]
+    pipeline = [
+        {
+            "$geoNear": {
+                "near": {"type": "Point", "coordinates": [lng, lat]},
+                "key": "geo",
+                "distanceField": "distance_km",
+                "distanceMultiplier": 0.001,
+                "maxDistance": radius * 1000,
+                "query": query,
+                "spherical": True
+            }
+        },
+        {"$limit": limit}
+    ]
+    if projection:
+        pipeline.append({"$project": {**projection, "distance_km": 1}})
+    
+    businesses = await db.businesses.aggregate(pipeline).to_list(limit)
+    if projection:
+        return trusted_response(businesses)
+    return trusted_response([{**trusted_dump(BusinessProfile, business), "distance_km": business["distance_km"]} for business in businesses])
+
+@api_router.get("/businesses/facets")
+async def get_business_facets(
+    island: Optional[str] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = "approved"
+):
+    """Business counts per island and per category for the filter sidebar"""
+    key = cache_key("facets:businesses", island, category, status)
+    facets = await cache_backend.get(key)
+    if facets is None:
+        facets = await facet_counts(
+            db.businesses,
+            {"status": status} if status else {},
+            {
+                "island": {"island": island} if island else {},
+                "category": {"category": category} if category else {}
+            }
+        )
+        await cache_backend.set(key, facets, FACET_CACHE_TTL)
+    return facets
 
 @api_router.post("/business/create", response_model=BusinessProfile)
 async def create_business(
@@ -965,24 +2903,30 @@ async def create_business(
     business_dict["user_id"] = current_user.id
     business = BusinessProfile(**business_dict)
     
-    await db.businesses.insert_one(business.dict())
+    await db.businesses.insert_one(business_document(business))
     return business
 
 @api_router.get("/business/{business_id}", response_model=BusinessProfile)
-async def get_business(business_id: str):
-    business_data = await db.businesses.find_one({"id": business_id})
-    if not business_data:
+async def get_business(business_id: str, request: Request, response: Response):
+    business = await get_conditional_detail(request, response, "business", db.businesses, BusinessProfile, business_id)
+    if not business:
         raise HTTPException(status_code=404, detail="Business not found")
-    return BusinessProfile(**business_data)
+    return business
 
 @api_router.get("/businesses")
 async def get_businesses(
+    request: Request,
+    response: Response,
     island: Optional[str] = None,
     category: Optional[str] = None,
     status: Optional[str] = "approved",
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 50
 ):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    projection = build_projection(fields, BusinessProfile, BUSINESS_CARD_PROJECTION)
     query = {}
     if island:
         query["island"] = island
@@ -990,9 +2934,25 @@ async def get_businesses(
         query["category"] = category
     if status:
         query["status"] = status
+    if cursor:
+        # A bad cursor is this request's 400, not a failure of the shared computation
+        decode_cursor(cursor, len(BUSINESS_SORT))
+    
+    async def load_page():
+        businesses, next_cursor = await fetch_page(db.businesses, query, BUSINESS_SORT, cursor, skip, limit, projection)
+        if not projection:
+            businesses = [trusted_dump(BusinessProfile, business) for business in businesses]
+        return [businesses, next_cursor]
     
-    businesses = await db.businesses.find(query).skip(skip).limit(limit).to_list(limit)
-    return [BusinessProfile(**business) for business in businesses]
+    key = (island, category, status or None, projection_key(projection), cursor, skip, limit)
+    businesses, next_cursor = await business_list_cache.get_or_compute(key, load_page)
+    validators = page_validators("businesses", request, businesses)
+    if validators:
+        not_modified = conditional_response(request, response, *validators)
+        if not_modified:
+            return not_modified
+    set_next_cursor(response, next_cursor)
+    return trusted_response(businesses, response)
 
 # Photo upload routes
 @api_router.post("/business/{business_id}/upload-photos")
@@ -1006,41 +2966,42 @@ async def upload_business_photos(
     if not business:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    uploaded_photos = []
+    # Upload up to CLOUDINARY_UPLOADS_PER_REQUEST files at a time
+    request_slots = asyncio.Semaphore(CLOUDINARY_UPLOADS_PER_REQUEST)
     
-    for file in files:
-        try:
-            # Upload to Cloudinary
-            photo_metadata = await upload_to_cloudinary(file, business_id)
-            
-            # Save metadata to database
-            await db.photos.insert_one(photo_metadata.dict())
-            
-            # Add photo URL to business photos array
-            await db.businesses.update_one(
-                {"id": business_id},
-                {"$push": {"photos": photo_metadata.optimized_url}}
-            )
-            
-            uploaded_photos.append({
-                "id": photo_metadata.id,
-                "url": photo_metadata.optimized_url,
-                "thumbnail": photo_metadata.thumbnail_url
-            })
-            
-        except Exception as e:
-            logger.error(f"Error uploading photo {file.filename}: {str(e)}")
-            continue
+    async def upload(file: UploadFile) -> Optional[PhotoMetadata]:
+        async with request_slots:
+            try:
+                return await upload_to_cloudinary(file, business_id)
+            except Exception as e:
+                logger.error(f"Error uploading photo {file.filename}: {str(e)}")
+                return None
+    
+    photos = [photo for photo in await asyncio.gather(*(upload(file) for file in files)) if photo]
+    
+    if photos:
+        # Save metadata and add the photo URLs to the business in one write each
+        await db.photos.insert_many([photo.dict() for photo in photos])
+        await db.businesses.update_one(
+            {"id": business_id},
+            {"$push": {"photos": {"$each": [photo.optimized_url for photo in photos]}}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+        await invalidate_detail("business", business_id)
+    
+    uploaded_photos = [
+        {"id": photo.id, "url": photo.optimized_url, "thumbnail": photo.thumbnail_url}
+        for photo in photos
+    ]
     
     return {
         "message": f"Successfully uploaded {len(uploaded_photos)} photos",
         "photos": uploaded_photos
     }
 
-@api_router.get("/business/{business_id}/photos")
+@api_router.get("/business/{business_id}/photos", response_model=List[PhotoMetadata])
 async def get_business_photos(business_id: str):
     photos = await db.photos.find({"business_id": business_id}).to_list(100)
-    return [PhotoMetadata(**photo) for photo in photos]
+    return trusted_response([trusted_model(PhotoMetadata, photo) for photo in photos])
 
 @api_router.delete("/photos/{photo_id}")
 async def delete_photo(photo_id: str, current_user: User = Depends(get_current_user)):
@@ -1049,7 +3010,7 @@ async def delete_photo(photo_id: str, current_user: User = Depends(get_current_u
     if not photo_data:
         raise HTTPException(status_code=404, detail="Photo not found")
     
-    photo = PhotoMetadata(**photo_data)
+    photo = trusted_model(PhotoMetadata, photo_data)
     
     # Verify business ownership
     business = await db.businesses.find_one({"id": photo.business_id, "user_id": current_user.id})
@@ -1059,7 +3020,7 @@ async def delete_photo(photo_id: str, current_user: User = Depends(get_current_u
     try:
         # Delete from Cloudinary
         if os.environ.get('CLOUDINARY_CLOUD_NAME') != 'PLACEHOLDER_CLOUD_NAME':
-            cloudinary.uploader.destroy(photo.cloudinary_public_id)
+            await run_cloudinary(cloudinary.uploader.destroy, photo.cloudinary_public_id)
         
         # Remove from database
         await db.photos.delete_one({"id": photo_id})
@@ -1067,8 +3028,9 @@ async def delete_photo(photo_id: str, current_user: User = Depends(get_current_u
         # Remove from business photos array
         await db.businesses.update_one(
             {"id": photo.business_id},
-            {"$pull": {"photos": photo.optimized_url}}
+            {"$pull": {"photos": photo.optimized_url}, "$set": {"updated_at": datetime.utcnow()}}
         )
+        await invalidate_detail("business", photo.business_id)
         
         return {"message": "Photo deleted successfully"}
         
@@ -1097,6 +3059,7 @@ async def upload_business_profile_photo(
             {"id": business_id},
             {"$set": {"profile_photo": photo_metadata.optimized_url, "updated_at": datetime.utcnow()}}
         )
+        await invalidate_detail("business", business_id)
         
         return {
             "message": "Profile photo uploaded successfully",
@@ -1127,6 +3090,7 @@ async def upload_business_cover_photo(
             {"id": business_id},
             {"$set": {"cover_photo": photo_metadata.optimized_url, "updated_at": datetime.utcnow()}}
         )
+        await invalidate_detail("business", business_id)
         
         return {
             "message": "Cover photo uploaded successfully",
@@ -1157,6 +3121,7 @@ async def upload_business_logo(
             {"id": business_id},
             {"$set": {"logo": photo_metadata.optimized_url, "updated_at": datetime.utcnow()}}
         )
+        await invalidate_detail("business", business_id)
         
         return {
             "message": "Logo uploaded successfully",
@@ -1168,10 +3133,10 @@ async def upload_business_logo(
         raise HTTPException(status_code=500, detail="Failed to upload logo")
 
 # Business FAQ Routes
-@api_router.get("/business/{business_id}/faqs")
+@api_router.get("/business/{business_id}/faqs", response_model=List[BusinessFAQ])
 async def get_business_faqs(business_id: str):
     faqs = await db.business_faqs.find({"business_id": business_id, "is_active": True}).to_list(100)
-    return [BusinessFAQ(**faq) for faq in faqs]
+    return trusted_response([trusted_model(BusinessFAQ, faq) for faq in faqs])
 
 @api_router.post("/business/{business_id}/faqs", response_model=BusinessFAQ)
 async def create_business_faq(
@@ -1243,7 +3208,7 @@ async def create_appointment(
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
     
-    business_obj = BusinessProfile(**business)
+    business_obj = trusted_model(BusinessProfile, business)
     if not business_obj.accepts_appointments:
         raise HTTPException(status_code=400, detail="This business does not accept appointments")
     
@@ -1285,8 +3250,7 @@ async def get_business_appointments(
     enriched_appointments = []
     for appointment in appointments:
         customer = await db.users.find_one({"id": appointment["customer_id"]})
-        appointment_obj = Appointment(**appointment)
-        appointment_dict = appointment_obj.dict()
+        appointment_dict = trusted_dump(Appointment, appointment)
         if customer:
             appointment_dict["customer_name"] = f"{customer['first_name']} {customer['last_name']}"
             appointment_dict["customer_email"] = customer["email"]
@@ -1348,29 +3312,45 @@ async def create_review(
     
     return review
 
-@api_router.get("/business/{business_id}/reviews")
+@api_router.get("/business/{business_id}/reviews", response_model=List[Review])
 async def get_business_reviews(
     business_id: str,
+    request: Request,
+    response: Response,
     approved_only: bool = True,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 20
 ):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
     query = {"business_id": business_id}
     if approved_only:
         query["is_approved"] = True
     
-    reviews = await db.reviews.find(query).skip(skip).limit(limit).to_list(limit)
-    return [Review(**review) for review in reviews]
+    reviews = await paginate(db.reviews, query, REVIEW_SORT, cursor, skip, limit, response)
+    # updated_at moves when a review is approved, so the admin view's ETag changes with it
+    validators = page_validators("reviews", request, reviews, "updated_at", "created_at")
+    if validators:
+        not_modified = conditional_response(request, response, *validators)
+        if not_modified:
+            return not_modified
+    return trusted_response([trusted_model(Review, review) for review in reviews], response)
 
 # Event Routes
 @api_router.get("/events")
 async def get_events(
+    request: Request,
+    response: Response,
     island: Optional[str] = None,
     category: Optional[str] = None,
     date: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 50
 ):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    projection = build_projection(fields, Event, EVENT_CARD_PROJECTION)
     query = {"is_active": True, "is_paid": True}
     
     if island:
@@ -1385,9 +3365,24 @@ async def get_events(
             query["event_date"] = {"$gte": event_date, "$lt": next_day}
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    if cursor:
+        decode_cursor(cursor, len(EVENT_SORT))
+    
+    async def load_page():
+        events, next_cursor = await fetch_page(db.events, query, EVENT_SORT, cursor, skip, limit, projection)
+        if not projection:
+            events = [trusted_dump(Event, event) for event in events]
+        return [events, next_cursor]
     
-    events = await db.events.find(query).sort("event_date", 1).skip(skip).limit(limit).to_list(limit)
-    return [Event(**event) for event in events]
+    key = (island, category, date, projection_key(projection), cursor, skip, limit)
+    events, next_cursor = await event_list_cache.get_or_compute(key, load_page)
+    validators = page_validators("events", request, events)
+    if validators:
+        not_modified = conditional_response(request, response, *validators)
+        if not_modified:
+            return not_modified
+    set_next_cursor(response, next_cursor)
+    return trusted_response(events, response)
 
 @api_router.post("/event/create", response_model=Event)
 async def create_event(event_data: EventCreate):
@@ -1399,11 +3394,11 @@ async def create_event(event_data: EventCreate):
     return event
 
 @api_router.get("/event/{event_id}", response_model=Event)
-async def get_event(event_id: str):
-    event_data = await db.events.find_one({"id": event_id})
-    if not event_data:
+async def get_event(event_id: str, request: Request, response: Response):
+    event = await get_conditional_detail(request, response, "event", db.events, Event, event_id)
+    if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    return Event(**event_data)
+    return event
 
 # Event Payment Routes
 @api_router.post("/event/{event_id}/create-payment")
@@ -1413,14 +3408,14 @@ async def create_event_payment(event_id: str):
     if not event_data:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    event = Event(**event_data)
+    event = trusted_model(Event, event_data)
     
     if event.is_paid:
         raise HTTPException(status_code=400, detail="Event already paid")
     
     try:
         # Create PayPal payment for $5
-        payment = paypalrestsdk.Payment({
+        payment = await paypal_gateway.create_payment({
             "intent": "sale",
             "payer": {
                 "payment_method": "paypal"
@@ -1446,22 +3441,29 @@ async def create_event_payment(event_id: str):
                 "description": f"Payment for event listing: {event.title}"
             }]
         })
-
-        if payment.create():
-            # Get approval URL
-            approval_url = None
-            for link in payment.links:
-                if link.rel == "approval_url":
-                    approval_url = link.href
-                    break
-            
-            return {
-                "payment_id": payment.id,
-                "approval_url": approval_url,
-                "status": "created"
-            }
-        else:
-            raise HTTPException(status_code=500, detail="Failed to create payment")
+        
+        # Store payment info so webhooks can map the payment back to the event
+        await db.event_payments.insert_one({
+            "payment_id": payment.id,
+            "event_id": event_id,
+            "amount": 5.00,
+            "currency": "USD",
+            "status": "created",
+            "created_at": datetime.utcnow()
+        })
+        
+        # Get approval URL
+        approval_url = None
+        for link in payment.links:
+            if link.rel == "approval_url":
+                approval_url = link.href
+                break
+        
+        return {
+            "payment_id": payment.id,
+            "approval_url": approval_url,
+            "status": "created"
+        }
             
     except Exception as e:
         logger.error(f"Error creating event payment: {str(e)}")
@@ -1476,47 +3478,51 @@ async def execute_event_payment(
 ):
     try:
         # Execute PayPal payment
-        payment = paypalrestsdk.Payment.find(payment_id)
-        
-        if payment.execute({"payer_id": payer_id}):
-            # Update event as paid
-            await db.events.update_one(
-                {"id": event_id},
-                {
-                    "$set": {
-                        "is_paid": True,
-                        "payment_date": datetime.utcnow(),
-                        "paypal_payment_id": payment_id,
-                        "updated_at": datetime.utcnow()
-                    }
+        await paypal_gateway.execute_payment(payment_id, payer_id)
+        
+        # Update event as paid
+        await db.events.update_one(
+            {"id": event_id},
+            {
+                "$set": {
+                    "is_paid": True,
+                    "payment_date": datetime.utcnow(),
+                    "paypal_payment_id": payment_id,
+                    "updated_at": datetime.utcnow()
                 }
+            }
+        )
+        await invalidate_detail("event", event_id)
+        
+        # Update payment record
+        await db.event_payments.update_one(
+            {"payment_id": payment_id},
+            {"$set": {"status": "completed", "executed_at": datetime.utcnow()}}
+        )
+        
+        # Get event for email notification
+        event_data = await db.events.find_one({"id": event_id})
+        if event_data:
+            event = trusted_model(Event, event_data)
+            # Send confirmation email
+            background_tasks.add_task(
+                send_event_payment_confirmation,
+                event.organizer_email,
+                event.organizer_name,
+                event.title,
+                event.event_date.strftime("%B %d, %Y")
             )
-            
-            # Get event for email notification
-            event_data = await db.events.find_one({"id": event_id})
-            if event_data:
-                event = Event(**event_data)
-                # Send confirmation email
-                background_tasks.add_task(
-                    send_event_payment_confirmation,
-                    event.organizer_email,
-                    event.organizer_name,
-                    event.title,
-                    event.event_date.strftime("%B %d, %Y")
-                )
-            
-            return {"status": "success", "message": "Payment confirmed. Your event is now live!"}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to execute payment")
+        
+        return {"status": "success", "message": "Payment confirmed. Your event is now live!"}
             
     except Exception as e:
         logger.error(f"Error executing event payment: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/my-events")
+@api_router.get("/my-events", response_model=List[Event])
 async def get_my_events(organizer_email: str):
     events = await db.events.find({"organizer_email": organizer_email}).sort("event_date", 1).to_list(100)
-    return [Event(**event) for event in events]
+    return trusted_response([trusted_model(Event, event) for event in events])
 
 @api_router.put("/event/{event_id}")
 async def update_event(
@@ -1533,6 +3539,7 @@ async def update_event(
     update_data["updated_at"] = datetime.utcnow()
     
     await db.events.update_one({"id": event_id}, {"$set": update_data})
+    await invalidate_detail("event", event_id)
     
     updated_event = await db.events.find_one({"id": event_id})
     return Event(**updated_event)
@@ -1548,20 +3555,27 @@ async def delete_event(event_id: str, organizer_email: str):
         {"id": event_id},
         {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_detail("event", event_id)
     
     return {"message": "Event deleted successfully"}
 
 # Apartment Listing Routes
 @api_router.get("/apartments")
 async def get_apartments(
+    request: Request,
+    response: Response,
     island: Optional[str] = None,
     property_type: Optional[str] = None,
     min_rent: Optional[float] = None,
     max_rent: Optional[float] = None,
     bedrooms: Optional[int] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 50
 ):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    projection = build_projection(fields, ApartmentListing, APARTMENT_CARD_PROJECTION)
     query = {"is_active": True, "is_paid": True, "is_available": True}
     
     if island:
@@ -1578,8 +3592,48 @@ async def get_apartments(
             rent_query["$lte"] = max_rent
         query["monthly_rent"] = rent_query
     
-    apartments = await db.apartments.find(query).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    return [ApartmentListing(**apartment) for apartment in apartments]
+    apartments = await paginate(db.apartments, query, APARTMENT_SORT, cursor, skip, limit, response, projection)
+    validators = page_validators("apartments", request, apartments)
+    if validators:
+        not_modified = conditional_response(request, response, *validators)
+        if not_modified:
+            return not_modified
+    if projection:
+        return trusted_response(apartments, response)
+    return trusted_response([trusted_model(ApartmentListing, apartment) for apartment in apartments], response)
+
+@api_router.get("/apartments/facets")
+async def get_apartment_facets(
+    island: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_rent: Optional[float] = None,
+    max_rent: Optional[float] = None,
+    bedrooms: Optional[int] = None
+):
+    """Listing counts per island, property type and bedroom count for the filter sidebar"""
+    key = cache_key("facets:apartments", island, property_type, min_rent, max_rent, bedrooms)
+    facets = await cache_backend.get(key)
+    if facets is None:
+        base = {"is_active": True, "is_paid": True, "is_available": True}
+        if min_rent is not None or max_rent is not None:
+            rent_query = {}
+            if min_rent is not None:
+                rent_query["$gte"] = min_rent
+            if max_rent is not None:
+                rent_query["$lte"] = max_rent
+            base["monthly_rent"] = rent_query
+        
+        facets = await facet_counts(
+            db.apartments,
+            base,
+            {
+                "island": {"island": island} if island else {},
+                "property_type": {"property_type": property_type} if property_type else {},
+                "bedrooms": {"bedrooms": bedrooms} if bedrooms else {}
+            }
+        )
+        await cache_backend.set(key, facets, FACET_CACHE_TTL)
+    return facets
 
 @api_router.post("/apartment/create", response_model=ApartmentListing)
 async def create_apartment_listing(apartment_data: ApartmentListingCreate):
@@ -1593,12 +3647,12 @@ async def create_apartment_listing(apartment_data: ApartmentListingCreate):
     return ApartmentListing(**apartment_dict)
 
 @api_router.get("/apartment/{listing_id}", response_model=ApartmentListing)
-async def get_apartment_listing(listing_id: str):
-    apartment = await db.apartments.find_one({"id": listing_id, "is_active": True})
+async def get_apartment_listing(listing_id: str, request: Request, response: Response):
+    apartment = await get_conditional_detail(request, response, "apartment", db.apartments, ApartmentListing, listing_id, active_only=True)
     if not apartment:
         raise HTTPException(status_code=404, detail="Apartment listing not found")
     
-    return ApartmentListing(**apartment)
+    return apartment
 
 @api_router.post("/apartment/{listing_id}/create-payment")
 async def create_apartment_payment(listing_id: str):
@@ -1611,7 +3665,7 @@ async def create_apartment_payment(listing_id: str):
         raise HTTPException(status_code=400, detail="Apartment listing is already paid")
     
     try:
-        payment = paypalrestsdk.Payment({
+        payment = await paypal_gateway.create_payment({
             "intent": "sale",
             "payer": {
                 "payment_method": "paypal"
@@ -1638,31 +3692,27 @@ async def create_apartment_payment(listing_id: str):
             }]
         })
         
-        if payment.create():
-            # Store payment info
-            await db.apartment_payments.insert_one({
-                "payment_id": payment.id,
-                "listing_id": listing_id,
-                "amount": 10.00,
-                "currency": "USD",
-                "status": "created",
-                "created_at": datetime.utcnow()
-            })
-            
-            # Find approval URL
-            approval_url = None
-            for link in payment.links:
-                if link.rel == "approval_url":
-                    approval_url = link.href
-                    break
-            
-            return {
-                "payment_id": payment.id,
-                "approval_url": approval_url
-            }
-        else:
-            logging.error(f"PayPal payment creation failed: {payment.error}")
-            raise HTTPException(status_code=400, detail="Payment creation failed")
+        # Store payment info
+        await db.apartment_payments.insert_one({
+            "payment_id": payment.id,
+            "listing_id": listing_id,
+            "amount": 10.00,
+            "currency": "USD",
+            "status": "created",
+            "created_at": datetime.utcnow()
+        })
+        
+        # Find approval URL
+        approval_url = None
+        for link in payment.links:
+            if link.rel == "approval_url":
+                approval_url = link.href
+                break
+        
+        return {
+            "payment_id": payment.id,
+            "approval_url": approval_url
+        }
     
     except Exception as e:
         logging.error(f"Error creating apartment payment: {str(e)}")
@@ -1671,37 +3721,34 @@ async def create_apartment_payment(listing_id: str):
 @api_router.post("/apartment/{listing_id}/execute-payment")
 async def execute_apartment_payment(listing_id: str, payment_data: ApartmentPayment):
     try:
-        payment = paypalrestsdk.Payment.find(payment_data.paypal_payment_id)
-        
-        if payment.execute({"payer_id": payment_data.paypal_payment_id}):
-            # Update listing as paid
-            await db.apartments.update_one(
-                {"id": listing_id},
-                {
-                    "$set": {
-                        "is_paid": True,
-                        "payment_date": datetime.utcnow(),
-                        "paypal_payment_id": payment_data.paypal_payment_id,
-                        "updated_at": datetime.utcnow()
-                    }
+        await paypal_gateway.execute_payment(payment_data.paypal_payment_id, payment_data.paypal_payment_id)
+        
+        # Update listing as paid
+        await db.apartments.update_one(
+            {"id": listing_id},
+            {
+                "$set": {
+                    "is_paid": True,
+                    "payment_date": datetime.utcnow(),
+                    "paypal_payment_id": payment_data.paypal_payment_id,
+                    "updated_at": datetime.utcnow()
                 }
-            )
-            
-            # Update payment record
-            await db.apartment_payments.update_one(
-                {"payment_id": payment_data.paypal_payment_id},
-                {
-                    "$set": {
-                        "status": "completed",
-                        "executed_at": datetime.utcnow()
-                    }
+            }
+        )
+        await invalidate_detail("apartment", listing_id)
+        
+        # Update payment record
+        await db.apartment_payments.update_one(
+            {"payment_id": payment_data.paypal_payment_id},
+            {
+                "$set": {
+                    "status": "completed",
+                    "executed_at": datetime.utcnow()
                 }
-            )
-            
-            return {"message": "Payment successful! Your apartment listing is now live."}
-        else:
-            logging.error(f"PayPal payment execution failed: {payment.error}")
-            raise HTTPException(status_code=400, detail="Payment execution failed")
+            }
+        )
+        
+        return {"message": "Payment successful! Your apartment listing is now live."}
     
     except Exception as e:
         logging.error(f"Error executing apartment payment: {str(e)}")
@@ -1714,18 +3761,19 @@ async def upload_apartment_photo(
     contact_email: str = Form(...)
 ):
     # Verify listing ownership
-    listing = await db.apartments.find_one({"id": listing_id, "contact_email": contact_email})
+    listing = await db.apartments.find_one({"id": listing_id, "contact_email": contact_email, "is_active": True})
     if not listing:
         raise HTTPException(status_code=404, detail="Apartment listing not found or access denied")
     
-    # Check photo limit (max 6 photos)
+    # Check photo limit (max 6 photos); the update below enforces it again atomically
     current_photos = listing.get("photos", [])
     if len(current_photos) >= 6:
         raise HTTPException(status_code=400, detail="Maximum 6 photos allowed per listing")
     
     try:
         # Upload to Cloudinary
-        upload_result = cloudinary.uploader.upload(
+        upload_result = await run_cloudinary(
+            cloudinary.uploader.upload,
             file.file,
             folder=f"apartment_listings/{listing_id}",
             transformation=[
@@ -1733,32 +3781,42 @@ async def upload_apartment_photo(
             ]
         )
         
-        # Update listing with new photo
-        new_photos = current_photos + [upload_result["secure_url"]]
-        await db.apartments.update_one(
-            {"id": listing_id},
+        # Append the photo unless the listing already has 6 (no photos.5) or was
+        # deactivated meanwhile; $push keeps concurrent uploads from overwriting each other
+        updated = await db.apartments.find_one_and_update(
+            {"id": listing_id, "is_active": True, "photos.5": {"$exists": False}},
             {
-                "$set": {
-                    "photos": new_photos,
-                    "updated_at": datetime.utcnow()
-                }
-            }
+                "$push": {"photos": upload_result["secure_url"]},
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            projection={"_id": 0, "photos": 1},
+            return_document=ReturnDocument.AFTER
         )
-        
-        return {
-            "message": "Photo uploaded successfully",
-            "photo_url": upload_result["secure_url"],
-            "total_photos": len(new_photos)
-        }
-    
     except Exception as e:
         logging.error(f"Error uploading apartment photo: {str(e)}")
         raise HTTPException(status_code=500, detail="Photo upload failed")
+    
+    if updated is None:
+        # Don't leave the rejected photo in Cloudinary
+        try:
+            await run_cloudinary(cloudinary.uploader.destroy, upload_result["public_id"])
+        except Exception as e:
+            logger.error(f"Error deleting unused apartment photo: {str(e)}")
+        if await db.apartments.count_documents({"id": listing_id, "is_active": True}, limit=1):
+            raise HTTPException(status_code=400, detail="Maximum 6 photos allowed per listing")
+        raise HTTPException(status_code=404, detail="Apartment listing not found")
+    await invalidate_detail("apartment", listing_id)
+    
+    return {
+        "message": "Photo uploaded successfully",
+        "photo_url": upload_result["secure_url"],
+        "total_photos": len(updated["photos"])
+    }
 
-@api_router.get("/my-apartments")
+@api_router.get("/my-apartments", response_model=List[ApartmentListing])
 async def get_my_apartment_listings(contact_email: str):
     listings = await db.apartments.find({"contact_email": contact_email, "is_active": True}).sort("created_at", -1).to_list(100)
-    return [ApartmentListing(**listing) for listing in listings]
+    return trusted_response([trusted_model(ApartmentListing, listing) for listing in listings])
 
 @api_router.put("/apartment/{listing_id}")
 async def update_apartment_listing(
@@ -1778,6 +3836,7 @@ async def update_apartment_listing(
         {"id": listing_id},
         {"$set": update_data}
     )
+    await invalidate_detail("apartment", listing_id)
     
     return {"message": "Apartment listing updated successfully"}
 
@@ -1792,17 +3851,18 @@ async def delete_apartment_listing(listing_id: str, contact_email: str):
         {"id": listing_id},
         {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_detail("apartment", listing_id)
     
     return {"message": "Apartment listing deleted successfully"}
 
 # Admin Routes
-@api_router.get("/admin/businesses/pending")
+@api_router.get("/admin/businesses/pending", response_model=List[BusinessProfile])
 async def get_pending_businesses(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
     businesses = await db.businesses.find({"status": BusinessStatus.PENDING}).to_list(100)
-    return [BusinessProfile(**business) for business in businesses]
+    return trusted_response([trusted_model(BusinessProfile, business) for business in businesses])
 
 @api_router.put("/admin/business/{business_id}/approve")
 async def approve_business(
@@ -1816,10 +3876,15 @@ async def approve_business(
         {"id": business_id},
         {"$set": {"status": BusinessStatus.APPROVED, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_detail("business", business_id)
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Business not found")
     
+    business = await db.businesses.find_one({"id": business_id})
+    if business:
+        await business_indexes_changed(business)
+    
     return {"message": "Business approved successfully"}
 
 @api_router.put("/admin/business/{business_id}/reject")
@@ -1834,19 +3899,24 @@ async def reject_business(
         {"id": business_id},
         {"$set": {"status": BusinessStatus.REJECTED, "updated_at": datetime.utcnow()}}
     )
+    await invalidate_detail("business", business_id)
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Business not found")
     
+    business = await db.businesses.find_one({"id": business_id})
+    if business:
+        await business_indexes_changed(business)
+    
     return {"message": "Business rejected"}
 
-@api_router.get("/admin/reviews/pending")
+@api_router.get("/admin/reviews/pending", response_model=List[Review])
 async def get_pending_reviews(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
     reviews = await db.reviews.find({"is_approved": False}).to_list(100)
-    return [Review(**review) for review in reviews]
+    return trusted_response([trusted_model(Review, review) for review in reviews])
 
 @api_router.put("/admin/review/{review_id}/approve")
 async def approve_review(
@@ -1858,7 +3928,7 @@ async def approve_review(
     
     result = await db.reviews.update_one(
         {"id": review_id},
-        {"$set": {"is_approved": True}}
+        {"$set": {"is_approved": True, "updated_at": datetime.utcnow()}}
     )
     
     if result.matched_count == 0:
@@ -1870,7 +3940,7 @@ async def approve_review(
 @api_router.post("/paypal/create-plan")
 async def create_billing_plan():
     try:
-        billing_plan = paypalrestsdk.BillingPlan({
+        billing_plan = await paypal_gateway.create_billing_plan({
             "name": "The Direct Tree Monthly Subscription",
             "description": "$20/month recurring subscription for business owners",
             "type": "INFINITE",
@@ -1897,25 +3967,19 @@ async def create_billing_plan():
                 "max_fail_attempts": "3"
             }
         })
-
-        if billing_plan.create():
-            if billing_plan.activate():
-                # Store in database
-                plan_data = {
-                    "id": str(uuid.uuid4()),
-                    "paypal_plan_id": billing_plan.id,
-                    "name": billing_plan.name,
-                    "amount": "20.00",
-                    "currency": "USD",
-                    "status": "ACTIVE",
-                    "created_at": datetime.utcnow()
-                }
-                await db.billing_plans.insert_one(plan_data)
-                return {"plan_id": billing_plan.id, "status": "ACTIVE"}
-            else:
-                raise HTTPException(status_code=500, detail="Failed to activate billing plan")
-        else:
-            raise HTTPException(status_code=500, detail="Failed to create billing plan")
+        
+        # Store in database
+        plan_data = {
+            "id": str(uuid.uuid4()),
+            "paypal_plan_id": billing_plan.id,
+            "name": billing_plan.name,
+            "amount": "20.00",
+            "currency": "USD",
+            "status": "ACTIVE",
+            "created_at": datetime.utcnow()
+        }
+        await db.billing_plans.insert_one(plan_data)
+        return {"plan_id": billing_plan.id, "status": "ACTIVE"}
     except Exception as e:
         logger.error(f"Error creating billing plan: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1942,7 +4006,7 @@ async def create_subscription(
         # Calculate trial end date
         trial_end = datetime.utcnow() + timedelta(days=7)
         
-        billing_agreement = paypalrestsdk.BillingAgreement({
+        billing_agreement = await paypal_gateway.create_agreement({
             "name": "The Direct Tree Monthly Subscription",
             "description": "$20/month subscription with 7-day trial",
             "start_date": trial_end.isoformat() + "Z",
@@ -1956,34 +4020,31 @@ async def create_subscription(
                 }
             }
         })
-
-        if billing_agreement.create():
-            # Store subscription in database
-            subscription_data = PayPalSubscription(
-                user_id=current_user.id,
-                business_id=business["id"],
-                paypal_subscription_id=billing_agreement.id,
-                plan_id=request.plan_id,
-                status="PENDING",
-                trial_end_date=trial_end
-            )
-            
-            await db.subscriptions.insert_one(subscription_data.dict())
-            
-            # Get approval URL
-            approval_url = None
-            for link in billing_agreement.links:
-                if link.rel == "approval_url":
-                    approval_url = link.href
-                    break
-            
-            return SubscriptionResponse(
-                subscription_id=billing_agreement.id,
-                approval_url=approval_url,
-                status="PENDING"
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Failed to create subscription")
+        
+        # Store subscription in database
+        subscription_data = PayPalSubscription(
+            user_id=current_user.id,
+            business_id=business["id"],
+            paypal_subscription_id=billing_agreement.id,
+            plan_id=request.plan_id,
+            status="PENDING",
+            trial_end_date=trial_end
+        )
+        
+        await db.subscriptions.insert_one(subscription_data.dict())
+        
+        # Get approval URL
+        approval_url = None
+        for link in billing_agreement.links:
+            if link.rel == "approval_url":
+                approval_url = link.href
+                break
+        
+        return SubscriptionResponse(
+            subscription_id=billing_agreement.id,
+            approval_url=approval_url,
+            status="PENDING"
+        )
     except Exception as e:
         logger.error(f"Error creating subscription: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1991,47 +4052,52 @@ async def create_subscription(
 @api_router.post("/paypal/execute-subscription/{subscription_id}")
 async def execute_subscription(
     subscription_id: str, 
-    payer_id: str,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    payer_id: Optional[str] = None
 ):
+    """Execute an approved billing agreement.
+
+    payer_id is accepted for the frontend's PayPal return URL but ignored:
+    executing an agreement only needs its token.
+    """
     try:
-        billing_agreement = paypalrestsdk.BillingAgreement.find(subscription_id)
-        
-        if billing_agreement.execute({"payer_id": payer_id}):
-            # Update subscription status in database
-            await db.subscriptions.update_one(
-                {"paypal_subscription_id": subscription_id},
-                {
-                    "$set": {
-                        "status": "ACTIVE",
-                        "activated_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
-                    }
+        await paypal_gateway.execute_agreement(subscription_id)
+        
+        # Update subscription status in database
+        await db.subscriptions.update_one(
+            {"paypal_subscription_id": subscription_id},
+            {
+                "$set": {
+                    "status": "ACTIVE",
+                    "activated_at": datetime.utcnow(),
+                    "state_changed_at": datetime.utcnow(),
+                    "updated_at": datetime.utcnow(),
+                    "last_synced_at": datetime.utcnow()
                 }
+            }
+        )
+        
+        # Update business subscription status
+        subscription = await db.subscriptions.find_one({"paypal_subscription_id": subscription_id})
+        if subscription:
+            await db.businesses.update_one(
+                {"id": subscription["business_id"]},
+                {"$set": {"subscription_status": SubscriptionStatus.ACTIVE, "updated_at": datetime.utcnow()}}
             )
+            await invalidate_detail("business", subscription["business_id"])
             
-            # Update business subscription status
-            subscription = await db.subscriptions.find_one({"paypal_subscription_id": subscription_id})
-            if subscription:
-                await db.businesses.update_one(
-                    {"id": subscription["business_id"]},
-                    {"$set": {"subscription_status": SubscriptionStatus.ACTIVE}}
+            # Get user info for email
+            user = await db.users.find_one({"id": subscription["user_id"]})
+            if user:
+                # Send payment confirmation email
+                background_tasks.add_task(
+                    send_payment_confirmation_email,
+                    user["email"],
+                    f"{user['first_name']} {user['last_name']}",
+                    "20.00"
                 )
-                
-                # Get user info for email
-                user = await db.users.find_one({"id": subscription["user_id"]})
-                if user:
-                    # Send payment confirmation email
-                    background_tasks.add_task(
-                        send_payment_confirmation_email,
-                        user["email"],
-                        f"{user['first_name']} {user['last_name']}",
-                        "20.00"
-                    )
-            
-            return {"status": "ACTIVE", "message": "Subscription activated successfully"}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to execute subscription")
+        
+        return {"status": "ACTIVE", "message": "Subscription activated successfully"}
     except Exception as e:
         logger.error(f"Error executing subscription: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2047,34 +4113,30 @@ async def cancel_subscription(subscription_id: str, current_user: User = Depends
         if not subscription:
             raise HTTPException(status_code=404, detail="Subscription not found")
         
-        billing_agreement = paypalrestsdk.BillingAgreement.find(subscription_id)
+        await paypal_gateway.cancel_agreement(subscription_id, "Subscription cancelled by user request")
         
-        cancel_note = {
-            "note": "Subscription cancelled by user request"
-        }
-        
-        if billing_agreement.cancel(cancel_note):
-            # Update subscription status in database
-            await db.subscriptions.update_one(
-                {"paypal_subscription_id": subscription_id},
-                {
-                    "$set": {
-                        "status": "CANCELLED",
-                        "cancelled_at": datetime.utcnow(),
-                        "updated_at": datetime.utcnow()
-                    }
+        # Update subscription status in database
+        await db.subscriptions.update_one(
+            {"paypal_subscription_id": subscription_id},
+            {
+                "$set": {
+                    "status": "CANCELLED",
+                    "cancelled_at": datetime.utcnow(),
+                    "state_changed_at": datetime.utcnow(),
+                    "updated_at": datetime.utcnow(),
+                    "last_synced_at": datetime.utcnow()
                 }
-            )
-            
-            # Update business subscription status
-            await db.businesses.update_one(
-                {"id": subscription["business_id"]},
-                {"$set": {"subscription_status": SubscriptionStatus.CANCELLED}}
-            )
-            
-            return {"status": "CANCELLED", "message": "Subscription cancelled successfully"}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to cancel subscription")
+            }
+        )
+        
+        # Update business subscription status
+        await db.businesses.update_one(
+            {"id": subscription["business_id"]},
+            {"$set": {"subscription_status": SubscriptionStatus.CANCELLED, "updated_at": datetime.utcnow()}}
+        )
+        await invalidate_detail("business", subscription["business_id"])
+        
+        return {"status": "CANCELLED", "message": "Subscription cancelled successfully"}
     except Exception as e:
         logger.error(f"Error cancelling subscription: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2089,52 +4151,355 @@ async def promote_user_to_admin(email: str, current_user: User = Depends(get_cur
     if admin_count > 0 and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Only existing admins can promote users")
     
-    result = await db.users.update_one(
+    promoted_user = await db.users.find_one_and_update(
         {"email": email},
-        {"$set": {"role": "admin"}}
+        {"$set": {"role": "admin"}},
+        projection={"id": 1}
     )
     
-    if result.matched_count == 0:
+    if not promoted_user:
         raise HTTPException(status_code=404, detail="User not found")
+    await invalidate_user(promoted_user["id"])
     
     return {"message": f"User {email} promoted to admin successfully"}
 
+# Subscription utility functions
+# Subscription state is served from db.subscriptions; a background reconciler
+# re-checks agreements with PayPal once they are older than SUBSCRIPTION_SYNC_TTL
+SUBSCRIPTION_SYNC_TTL = int(os.environ.get('SUBSCRIPTION_SYNC_TTL', '3600'))  # seconds
+SUBSCRIPTION_RECONCILE_INTERVAL = int(os.environ.get('SUBSCRIPTION_RECONCILE_INTERVAL', '300'))  # seconds, 0 disables
+SUBSCRIPTION_RECONCILE_CONCURRENCY = int(os.environ.get('SUBSCRIPTION_RECONCILE_CONCURRENCY', '4'))
+SUBSCRIPTION_RECONCILE_BATCH = 200
+SUBSCRIPTION_SYNC_LEASE = 120  # seconds a claimed subscription is reserved for one worker
+SUBSCRIPTION_SYNC_MAX_BACKOFF = int(os.environ.get('SUBSCRIPTION_SYNC_MAX_BACKOFF', '86400'))  # seconds
+CLOSED_SUBSCRIPTION_STATES = ["CANCELLED", "EXPIRED"]
+# PayPal agreement state -> SubscriptionStatus shown on the business
+BUSINESS_SUBSCRIPTION_STATUS = {
+    "ACTIVE": SubscriptionStatus.ACTIVE,
+    "SUSPENDED": SubscriptionStatus.PAST_DUE,
+    "CANCELLED": SubscriptionStatus.CANCELLED,
+    "EXPIRED": SubscriptionStatus.CANCELLED,
+}
+
+def parse_paypal_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+def subscription_is_stale(subscription: dict) -> bool:
+    last_synced_at = subscription.get("last_synced_at")
+    return last_synced_at is None or datetime.utcnow() - last_synced_at > timedelta(seconds=SUBSCRIPTION_SYNC_TTL)
+
+async def apply_subscription_state(
+    paypal_subscription_id: str,
+    status: str,
+    next_billing_date: Optional[datetime] = None,
+    changed_at: Optional[datetime] = None,
+    keep_states: List[str] = ()
+) -> Optional[dict]:
+    """Store a PayPal agreement state and return the subscription, or None if unknown.
+
+    Idempotent: the business's subscription_status is only touched when the
+    stored state actually changes. changed_at is when PayPal made the change
+    (a webhook's create_time, now for a direct check); a change older than the
+    stored one is ignored, so late or redelivered webhooks can't roll the
+    status back. A subscription in one of keep_states is never moved.
+    """
+    now = datetime.utcnow()
+    changed_at = changed_at or now
+    synced = {"last_synced_at": now, "sync_attempts": 0, "sync_failed_at": None, "sync_retry_at": None, "sync_lease_until": None}
+    if next_billing_date:
+        synced["next_billing_date"] = next_billing_date
+    
+    subscription = await db.subscriptions.find_one_and_update(
+        {
+            "paypal_subscription_id": paypal_subscription_id,
+            "status": {"$ne": status, "$nin": list(keep_states)},
+            "$or": [{"state_changed_at": None}, {"state_changed_at": {"$lte": changed_at}}]
+        },
+        {"$set": {**synced, "status": status, "state_changed_at": changed_at, "updated_at": now}},
+        return_document=ReturnDocument.AFTER
+    )
+    if subscription is None:
+        # Unchanged, superseded by a newer change or kept: only record the check
+        return await db.subscriptions.find_one_and_update(
+            {"paypal_subscription_id": paypal_subscription_id},
+            {"$set": synced},
+            return_document=ReturnDocument.AFTER
+        )
+    
+    business_status = BUSINESS_SUBSCRIPTION_STATUS.get(status)
+    if business_status:
+        await db.businesses.update_one(
+            {"id": subscription["business_id"]},
+            {"$set": {"subscription_status": business_status, "updated_at": now}}
+        )
+        await invalidate_detail("business", subscription["business_id"])
+    return subscription
+
+async def sync_subscription(subscription: dict) -> dict:
+    """Refresh one subscription from its PayPal billing agreement and return the stored document"""
+    billing_agreement = await paypal_gateway.find_agreement(subscription["paypal_subscription_id"])
+    agreement_details = getattr(billing_agreement, "agreement_details", None)
+    return await apply_subscription_state(
+        subscription["paypal_subscription_id"],
+        str(billing_agreement.state).upper(),
+        parse_paypal_datetime(getattr(agreement_details, "next_billing_date", None))
+    )
+
+def subscription_sync_backoff(attempts: int) -> timedelta:
+    """Delay before retrying a subscription whose last `attempts` checks failed"""
+    delay = min(SUBSCRIPTION_RECONCILE_INTERVAL * 2 ** min(attempts, 16), SUBSCRIPTION_SYNC_MAX_BACKOFF)
+    return timedelta(seconds=max(delay, 60) * random.uniform(0.8, 1.2))
+
+async def claim_stale_subscription() -> Optional[dict]:
+    """Lease the next subscription due for a sync to this worker, or None when there is none.
+
+    Rows that keep failing are skipped until their sync_retry_at and sorted
+    after healthy ones, so they can't hold up the batch. The lease keeps other
+    uvicorn workers from syncing the same row at the same time.
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=SUBSCRIPTION_SYNC_TTL)
+    return await db.subscriptions.find_one_and_update(
+        {
+            "status": {"$nin": CLOSED_SUBSCRIPTION_STATES},
+            "$and": [
+                {"$or": [{"last_synced_at": None}, {"last_synced_at": {"$lt": cutoff}}]},
+                {"$or": [{"sync_retry_at": None}, {"sync_retry_at": {"$lte": now}}]},
+                {"$or": [{"sync_lease_until": None}, {"sync_lease_until": {"$lte": now}}]},
+            ]
+        },
+        {"$set": {"sync_lease_until": now + timedelta(seconds=SUBSCRIPTION_SYNC_LEASE)}},
+        sort=[("sync_attempts", 1), ("last_synced_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+async def record_subscription_sync_failure(subscription: dict):
+    now = datetime.utcnow()
+    attempts = subscription.get("sync_attempts", 0) + 1
+    await db.subscriptions.update_one(
+        {"id": subscription["id"]},
+        {"$set": {
+            "sync_attempts": attempts,
+            "sync_failed_at": now,
+            "sync_retry_at": now + subscription_sync_backoff(attempts),
+            "sync_lease_until": None
+        }}
+    )
+
+async def reconcile_subscriptions() -> int:
+    """Sync up to SUBSCRIPTION_RECONCILE_BATCH subscriptions not checked within SUBSCRIPTION_SYNC_TTL"""
+    claimed = 0
+    
+    async def worker():
+        nonlocal claimed
+        while claimed < SUBSCRIPTION_RECONCILE_BATCH:
+            subscription = await claim_stale_subscription()
+            if subscription is None:
+                return
+            claimed += 1
+            try:
+                await sync_subscription(subscription)
+            except Exception as e:
+                logger.error(f"Error syncing subscription {subscription['paypal_subscription_id']}: {str(e)}")
+                await record_subscription_sync_failure(subscription)
+    
+    await asyncio.gather(*(worker() for _ in range(SUBSCRIPTION_RECONCILE_CONCURRENCY)))
+    return claimed
+
+async def run_subscription_reconciler():
+    while True:
+        try:
+            synced = await reconcile_subscriptions()
+            if synced:
+                logger.info(f"Reconciled {synced} subscriptions with PayPal")
+        except Exception as e:
+            logger.error(f"Error reconciling subscriptions: {str(e)}")
+        await asyncio.sleep(SUBSCRIPTION_RECONCILE_INTERVAL)
+
 @api_router.get("/paypal/subscription-status")
-async def get_user_subscription_status(current_user: User = Depends(get_current_user)):
+async def get_user_subscription_status(refresh: bool = False, current_user: User = Depends(get_current_user)):
+    """Subscription state as last synced from PayPal; refresh=true checks with PayPal first"""
     try:
-        # Get from database
         subscription = await db.subscriptions.find_one({"user_id": current_user.id})
         
         if not subscription:
             return {"status": "NONE", "message": "No subscription found"}
         
-        # Verify with PayPal
-        billing_agreement = paypalrestsdk.BillingAgreement.find(subscription["paypal_subscription_id"])
-        
-        # Update database if status changed
-        if billing_agreement.state != subscription["status"]:
-            await db.subscriptions.update_one(
-                {"paypal_subscription_id": subscription["paypal_subscription_id"]},
-                {
-                    "$set": {
-                        "status": billing_agreement.state,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
+        if refresh:
+            subscription = await sync_subscription(subscription)
         
         return {
             "subscription_id": subscription["paypal_subscription_id"],
-            "status": billing_agreement.state,
+            "status": subscription["status"],
             "amount": subscription["amount"],
             "currency": subscription["currency"],
             "trial_end_date": subscription.get("trial_end_date"),
-            "next_billing_date": getattr(billing_agreement.agreement_details, 'next_billing_date', None) if hasattr(billing_agreement, 'agreement_details') else None
+            "next_billing_date": subscription.get("next_billing_date"),
+            "last_synced_at": subscription.get("last_synced_at"),
+            "stale": subscription_is_stale(subscription)
         }
     except Exception as e:
         logger.error(f"Error checking subscription status: {str(e)}")
         return {"status": "ERROR", "message": str(e)}
 
+# PayPal webhook utility functions
+PAYPAL_WEBHOOK_ID = os.environ.get('PAYPAL_WEBHOOK_ID')
+PAYPAL_WEBHOOK_VERIFY = os.environ.get('PAYPAL_WEBHOOK_VERIFY', 'on') != 'off'  # off only for local stand-in tests
+# Billing agreement event -> stored subscription status
+WEBHOOK_SUBSCRIPTION_STATES = {
+    "BILLING.SUBSCRIPTION.CANCELLED": "CANCELLED",
+    "BILLING.SUBSCRIPTION.SUSPENDED": "SUSPENDED",
+    "BILLING.SUBSCRIPTION.RE-ACTIVATED": "ACTIVE",
+    "BILLING.SUBSCRIPTION.EXPIRED": "EXPIRED",
+}
+
+async def apply_sale_completed(sale: dict, changed_at: Optional[datetime] = None):
+    """PAYMENT.SALE.COMPLETED: a recurring subscription charge or a one-off event/apartment payment"""
+    if sale.get("billing_agreement_id"):
+        # A charge confirms an active agreement but never reopens a closed or suspended one
+        await apply_subscription_state(
+            sale["billing_agreement_id"],
+            "ACTIVE",
+            changed_at=changed_at,
+            keep_states=CLOSED_SUBSCRIPTION_STATES + ["SUSPENDED"]
+        )
+        return
+    
+    payment_id = sale.get("parent_payment")
+    if not payment_id:
+        return
+    now = datetime.utcnow()
+    
+    event_payment = await db.event_payments.find_one_and_update(
+        {"payment_id": payment_id},
+        {"$set": {"status": "completed", "sale_id": sale.get("id")}}
+    )
+    if event_payment:
+        event = await db.events.find_one_and_update(
+            {"id": event_payment["event_id"], "is_paid": {"$ne": True}},
+            {"$set": {"is_paid": True, "payment_date": now, "paypal_payment_id": payment_id, "updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if event:
+            await invalidate_detail("event", event["id"])
+            await send_event_payment_confirmation(
+                event["organizer_email"],
+                event["organizer_name"],
+                event["title"],
+                event["event_date"].strftime("%B %d, %Y")
+            )
+        return
+    
+    apartment_payment = await db.apartment_payments.find_one_and_update(
+        {"payment_id": payment_id},
+        {"$set": {"status": "completed", "sale_id": sale.get("id")}}
+    )
+    if apartment_payment:
+        result = await db.apartments.update_one(
+            {"id": apartment_payment["listing_id"], "is_paid": {"$ne": True}},
+            {"$set": {"is_paid": True, "payment_date": now, "paypal_payment_id": payment_id, "updated_at": now}}
+        )
+        if result.modified_count:
+            await invalidate_detail("apartment", apartment_payment["listing_id"])
+
+async def apply_sale_refunded(refund: dict):
+    """PAYMENT.SALE.REFUNDED/REVERSED: take the event or apartment listing back offline"""
+    payment_id = refund.get("parent_payment")
+    if not payment_id:
+        return
+    now = datetime.utcnow()
+    
+    for payments, collection, kind, id_field in (
+        (db.event_payments, db.events, "event", "event_id"),
+        (db.apartment_payments, db.apartments, "apartment", "listing_id"),
+    ):
+        payment = await payments.find_one_and_update({"payment_id": payment_id}, {"$set": {"status": "refunded"}})
+        if not payment:
+            continue
+        result = await collection.update_one(
+            {"id": payment[id_field], "paypal_payment_id": payment_id, "is_paid": True},
+            {"$set": {"is_paid": False, "updated_at": now}}
+        )
+        if result.modified_count:
+            await invalidate_detail(kind, payment[id_field])
+        return
+
+async def apply_webhook_event(event: dict):
+    event_type = event.get("event_type", "")
+    resource = event.get("resource") or {}
+    created_at = parse_paypal_datetime(event.get("create_time")) or datetime.utcnow()
+    
+    if event_type in WEBHOOK_SUBSCRIPTION_STATES:
+        await apply_subscription_state(resource["id"], WEBHOOK_SUBSCRIPTION_STATES[event_type], changed_at=created_at)
+    elif event_type.startswith("BILLING.SUBSCRIPTION.") and resource.get("state"):
+        await apply_subscription_state(resource["id"], str(resource["state"]).upper(), changed_at=created_at)
+    elif event_type == "PAYMENT.SALE.COMPLETED":
+        await apply_sale_completed(resource, created_at)
+    elif event_type in ("PAYMENT.SALE.REFUNDED", "PAYMENT.SALE.REVERSED"):
+        await apply_sale_refunded(resource)
+
+@api_router.post("/paypal/webhook")
+async def paypal_webhook(request: Request):
+    """Receive PayPal webhook events, verify them and apply each event id once"""
+    body = (await request.body()).decode("utf-8")
+    
+    if PAYPAL_WEBHOOK_VERIFY:
+        if not PAYPAL_WEBHOOK_ID:
+            logger.error("PayPal webhook received but PAYPAL_WEBHOOK_ID is not configured")
+            raise HTTPException(status_code=503, detail="Webhook not configured")
+        try:
+            verified = await paypal_gateway.verify_webhook(request.headers, body, PAYPAL_WEBHOOK_ID)
+        except PayPalGatewayError as e:
+            logger.error(f"Error verifying PayPal webhook: {str(e)}")
+            verified = False
+        if not verified:
+            raise HTTPException(status_code=400, detail="Invalid webhook signature")
+    
+    try:
+        event = json.loads(body)
+        event_id = event["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    
+    # Only the request that inserts the event record applies it; redeliveries
+    # match the existing record. The unique index covers concurrent deliveries.
+    try:
+        result = await db.paypal_webhook_events.update_one(
+            {"event_id": event_id},
+            {"$setOnInsert": {
+                "event_id": event_id,
+                "event_type": event.get("event_type"),
+                "resource_id": (event.get("resource") or {}).get("id"),
+                "status": "processing",
+                "received_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return {"status": "duplicate"}
+    if result.upserted_id is None:
+        return {"status": "duplicate"}
+    
+    try:
+        await apply_webhook_event(event)
+    except Exception as e:
+        # Forget the event so PayPal's retry gets another chance
+        logger.error(f"Error applying PayPal webhook {event_id}: {str(e)}")
+        await db.paypal_webhook_events.delete_one({"event_id": event_id})
+        raise HTTPException(status_code=500, detail="Webhook processing failed")
+    
+    await db.paypal_webhook_events.update_one(
+        {"event_id": event_id},
+        {"$set": {"status": "processed", "processed_at": datetime.utcnow()}}
+    )
+    return {"status": "processed"}
+
 # Utility function to update business rating
 async def update_business_rating(business_id: str):
     reviews = await db.reviews.find({"business_id": business_id, "is_approved": True}).to_list(1000)
@@ -2143,8 +4508,229 @@ async def update_business_rating(business_id: str):
         average_rating = total_rating / len(reviews)
         await db.businesses.update_one(
             {"id": business_id},
-            {"$set": {"rating_average": round(average_rating, 1), "rating_count": len(reviews)}}
+            {"$set": {"rating_average": round(average_rating, 1), "rating_count": len(reviews), "updated_at": datetime.utcnow()}}
         )
+        await invalidate_detail("business", business_id)
+
+# Index registry
+class IndexSpec(BaseModel):
+    collection: str
+    keys: List[tuple]
+    name: Optional[str] = None
+    unique: bool = False
+    sparse: bool = False
+    weights: Optional[Dict[str, int]] = None
+    serves: List[str] = []
+
+    def index_name(self) -> str:
+        # Same as MongoDB's default name, so indexes created elsewhere are recognised
+        return self.name or "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    def options(self) -> Dict:
+        options = {"name": self.index_name()}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.weights:
+            options["weights"] = self.weights
+            options["default_language"] = "english"
+        return options
+
+    def matches(self, info: Dict) -> bool:
+        if bool(info.get("unique")) != self.unique or bool(info.get("sparse")) != self.sparse:
+            return False
+        if self.weights:
+            return info.get("weights") == self.weights
+        return [(field, int(direction)) if isinstance(direction, (int, float)) else (field, direction)
+                for field, direction in info["key"]] == list(self.keys)
+
+INDEX_REGISTRY = [
+    # users
+    IndexSpec(collection="users", keys=[("id", 1)], unique=True,
+              serves=["get_current_user", "get_business_appointments", "execute_subscription"]),
+    IndexSpec(collection="users", keys=[("email", 1)], unique=True,
+              serves=["register", "login", "resend_verification", "promote_user_to_admin"]),
+    IndexSpec(collection="users", keys=[("verification_token", 1)], sparse=True,
+              serves=["verify_email"]),
+    IndexSpec(collection="users", keys=[("role", 1)],
+              serves=["promote_user_to_admin"]),
+    # businesses
+    IndexSpec(collection="businesses", keys=[("id", 1)], unique=True,
+              serves=["get_business", "upload_business_photos", "create_review", "create_appointment", "approve_business", "reject_business"]),
+    IndexSpec(collection="businesses", keys=[("user_id", 1)],
+              serves=["create_business", "create_subscription"]),
+    IndexSpec(collection="businesses", keys=[("status", 1)] + BUSINESS_SORT,
+              serves=["get_businesses", "get_pending_businesses", "search_businesses"]),
+    IndexSpec(collection="businesses", keys=[("island", 1), ("status", 1)] + BUSINESS_SORT,
+              serves=["get_businesses?island", "search_businesses?island"]),
+    IndexSpec(collection="businesses", keys=[("category", 1), ("status", 1)] + BUSINESS_SORT,
+              serves=["get_businesses?category", "search_businesses?category"]),
+    IndexSpec(collection="businesses", keys=[("geo", "2dsphere")],
+              serves=["get_nearby_businesses"]),
+    IndexSpec(collection="businesses", keys=[(field, "text") for field in BUSINESS_TEXT_INDEX_WEIGHTS],
+              name="business_text_search", weights=BUSINESS_TEXT_INDEX_WEIGHTS,
+              serves=["search_businesses"]),
+    # photos
+    IndexSpec(collection="photos", keys=[("id", 1)], unique=True,
+              serves=["delete_photo"]),
+    IndexSpec(collection="photos", keys=[("business_id", 1)],
+              serves=["get_business_photos"]),
+    # business_faqs
+    IndexSpec(collection="business_faqs", keys=[("id", 1)], unique=True,
+              serves=["update_business_faq", "delete_business_faq"]),
+    IndexSpec(collection="business_faqs", keys=[("business_id", 1), ("is_active", 1)],
+              serves=["get_business_faqs"]),
+    # appointments
+    IndexSpec(collection="appointments", keys=[("id", 1)], unique=True,
+              serves=["update_appointment_status"]),
+    IndexSpec(collection="appointments", keys=[("business_id", 1), ("appointment_date", 1)],
+              serves=["get_business_appointments"]),
+    # reviews
+    IndexSpec(collection="reviews", keys=[("id", 1)], unique=True,
+              serves=["approve_review"]),
+    IndexSpec(collection="reviews", keys=[("business_id", 1), ("is_approved", 1)] + REVIEW_SORT,
+              serves=["get_business_reviews", "update_business_rating"]),
+    IndexSpec(collection="reviews", keys=[("is_approved", 1)],
+              serves=["get_pending_reviews"]),
+    # events
+    IndexSpec(collection="events", keys=[("id", 1)], unique=True,
+              serves=["get_event", "create_event_payment", "execute_event_payment"]),
+    IndexSpec(collection="events", keys=[("is_active", 1), ("is_paid", 1)] + EVENT_SORT,
+              serves=["get_events"]),
+    IndexSpec(collection="events", keys=[("island", 1), ("is_active", 1), ("is_paid", 1)] + EVENT_SORT,
+              serves=["get_events?island"]),
+    IndexSpec(collection="events", keys=[("organizer_email", 1), ("event_date", 1)],
+              serves=["get_my_events", "update_event", "delete_event"]),
+    # apartments
+    IndexSpec(collection="apartments", keys=[("id", 1)], unique=True,
+              serves=["get_apartment_listing", "create_apartment_payment", "execute_apartment_payment"]),
+    IndexSpec(collection="apartments", keys=[("is_active", 1), ("is_paid", 1), ("is_available", 1)] + APARTMENT_SORT,
+              serves=["get_apartments"]),
+    IndexSpec(collection="apartments", keys=[("island", 1), ("is_active", 1), ("is_paid", 1), ("is_available", 1)] + APARTMENT_SORT,
+              serves=["get_apartments?island"]),
+    IndexSpec(collection="apartments", keys=[("contact_email", 1), ("is_active", 1), ("created_at", -1)],
+              serves=["get_my_apartment_listings", "upload_apartment_photo", "update_apartment_listing", "delete_apartment_listing"]),
+    IndexSpec(collection="apartment_payments", keys=[("payment_id", 1)],
+              serves=["execute_apartment_payment", "paypal_webhook"]),
+    IndexSpec(collection="event_payments", keys=[("payment_id", 1)],
+              serves=["execute_event_payment", "paypal_webhook"]),
+    IndexSpec(collection="paypal_webhook_events", keys=[("event_id", 1)], unique=True,
+              serves=["paypal_webhook"]),
+    # subscriptions
+    IndexSpec(collection="subscriptions", keys=[("paypal_subscription_id", 1)], unique=True,
+              serves=["execute_subscription", "cancel_subscription", "get_user_subscription_status", "paypal_webhook"]),
+    IndexSpec(collection="subscriptions", keys=[("user_id", 1)],
+              serves=["create_subscription", "get_user_subscription_status"]),
+    IndexSpec(collection="subscriptions", keys=[("sync_attempts", 1), ("last_synced_at", 1)],
+              serves=["claim_stale_subscription"]),
+]
+
+async def sync_indexes(dry_run: bool = False) -> Dict:
+    """Diff INDEX_REGISTRY against the database and create missing indexes.
+
+    Each entry is reported as ok, create (dry run), created, conflict (an index
+    with the same name but different definition exists) or error; indexes found
+    in the database but not in the registry are reported as unmanaged.
+    """
+    report = {"dry_run": dry_run, "collections": {}}
+    collections = sorted({spec.collection for spec in INDEX_REGISTRY})
+    
+    for collection in collections:
+        existing = await db[collection].index_information()
+        entries = []
+        for spec in (spec for spec in INDEX_REGISTRY if spec.collection == collection):
+            name = spec.index_name()
+            entry = {"name": name, "keys": spec.keys, "unique": spec.unique, "serves": spec.serves}
+            
+            if name in existing:
+                entry["action"] = "ok" if spec.matches(existing[name]) else "conflict"
+            elif dry_run:
+                entry["action"] = "create"
+            else:
+                try:
+                    await db[collection].create_index(spec.keys, **spec.options())
+                    entry["action"] = "created"
+                except Exception as e:
+                    entry["action"] = "error"
+                    entry["error"] = str(e)
+            entries.append(entry)
+        
+        managed = {spec.index_name() for spec in INDEX_REGISTRY if spec.collection == collection}
+        for name, info in existing.items():
+            if name != "_id_" and name not in managed:
+                entries.append({"name": name, "keys": info["key"], "action": "unmanaged", "serves": []})
+        
+        report["collections"][collection] = entries
+    
+    return report
+
+@api_router.get("/admin/cache-stats")
+async def get_cache_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {
+        "backend": cache_backend.stats(),
+        "business_lists": business_list_cache.stats(),
+        "event_lists": event_list_cache.stats()
+    }
+
+@api_router.get("/admin/email-stats")
+async def get_email_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return email_dispatcher.stats()
+
+@api_router.get("/admin/password-hasher-stats")
+async def get_password_hasher_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return password_hasher.stats()
+
+@api_router.get("/admin/indexes")
+async def get_index_report(current_user: User = Depends(get_current_user)):
+    """Report registered indexes, the queries they serve and their state in the database"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return await sync_indexes(dry_run=True)
+
+@api_router.post("/admin/indexes/sync")
+async def apply_index_registry_now(current_user: User = Depends(get_current_user)):
+    """Create missing registered indexes and report the result"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return await sync_indexes(dry_run=False)
+
+@api_router.get("/admin/export/{collection}")
+async def export_collection(
+    collection: str,
+    format: str = "ndjson",
+    gzip: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream a whole collection as NDJSON or CSV, optionally gzip-compressed"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if collection not in EXPORT_COLLECTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown collection. Use one of: {', '.join(EXPORT_COLLECTIONS)}")
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'ndjson' or 'csv'")
+    
+    columns = list(EXPORT_COLLECTIONS[collection].model_fields)
+    filename = f"{collection}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{format}"
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    if gzip:
+        # Sent as a .gz download rather than Content-Encoding, so clients keep the compressed file
+        filename, media_type = f"{filename}.gz", "application/gzip"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    
+    rows = export_rows(db[collection], columns, format)
+    return StreamingResponse(export_stream(rows, gzip), media_type=media_type, headers=headers)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -2155,6 +4741,15 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
+)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')),
+    gzip_level=int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6')),
+    brotli_quality=int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4')),
+    excluded_paths=("/api/admin/export",),
 )
 
 # Configure logging
@@ -2164,6 +4759,61 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+INDEX_SYNC_MODE = os.environ.get('INDEX_SYNC_MODE', 'apply')  # apply, dry-run or off
+
+@app.on_event("startup")
+async def apply_index_registry():
+    if INDEX_SYNC_MODE == "off":
+        return
+    try:
+        report = await sync_indexes(dry_run=INDEX_SYNC_MODE == "dry-run")
+    except Exception as e:
+        logger.error(f"Error syncing indexes: {str(e)}")
+        return
+    for collection, entries in report["collections"].items():
+        for entry in entries:
+            if entry["action"] not in ("ok", "created"):
+                logger.warning(f"Index {collection}.{entry['name']}: {entry['action']} {entry.get('error', '')}")
+
+business_index_task: Optional[asyncio.Task] = None
+subscription_reconciler_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_business_indexes():
+    # The suggest and fuzzy indexes always follow db.businesses; the search index only when enabled
+    global business_index_task
+    if SEARCH_INDEX_ENABLED and english_stemmer is None:
+        logger.warning("snowballstemmer is not installed; serving search from the Mongo text index")
+    business_index_task = asyncio.create_task(watch_business_changes(SEARCH_INDEX_ENABLED and english_stemmer is not None))
+
+@app.on_event("startup")
+async def ensure_webhook_event_index():
+    # Webhook dedup relies on this index whatever INDEX_SYNC_MODE is
+    try:
+        await db.paypal_webhook_events.create_index([("event_id", 1)], unique=True)
+    except Exception as e:
+        logger.error(f"Error creating paypal_webhook_events.event_id index: {str(e)}")
+
+@app.on_event("startup")
+async def start_email_dispatcher():
+    if not email_dispatcher.mock:
+        await email_dispatcher.start()
+
+@app.on_event("startup")
+async def start_subscription_reconciler():
+    global subscription_reconciler_task
+    if SUBSCRIPTION_RECONCILE_INTERVAL > 0:
+        subscription_reconciler_task = asyncio.create_task(run_subscription_reconciler())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if business_index_task:
+        business_index_task.cancel()
+    if subscription_reconciler_task:
+        subscription_reconciler_task.cancel()
+    await email_dispatcher.stop()
+    cloudinary_executor.shutdown(wait=False)
+    paypal_gateway.executor.shutdown(wait=False)
+    password_hasher.executor.shutdown(wait=False)
+    await cache_backend.close()
     client.close()
\ No newline at end of file
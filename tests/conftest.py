@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """server.db replaced by an in-memory mongomock database"""
+    from mongomock_motor import AsyncMongoMockClient
+
+    database = AsyncMongoMockClient()["test_database"]
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    backend = server.MemoryCacheBackend(maxsize=100)
+    monkeypatch.setattr(server, "cache_backend", backend)
+    return backend
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    """Route RedisCacheBackend connections to one shared fakeredis server"""
+    import fakeredis
+    import redis.asyncio
+
+    fake_server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.asyncio, "from_url", lambda url, **options: fakeredis.FakeAsyncRedis(server=fake_server))
+    return fake_server
@@ -0,0 +1,137 @@
+import asyncio
+
+import server
+
+
+def test_memory_write_skipped_after_invalidation():
+    backend = server.MemoryCacheBackend(maxsize=10)
+
+    async def scenario():
+        generations = await backend.tag_generations(["list:businesses"])
+        await backend.invalidate_tags("list:businesses")
+        stored = await backend.set_many({"page": [1]}, 60, ["list:businesses"], expected_generations=generations)
+        return stored, await backend.get("page")
+
+    assert asyncio.run(scenario()) == (False, None)
+
+
+def test_memory_write_stored_when_generation_unchanged():
+    backend = server.MemoryCacheBackend(maxsize=10)
+
+    async def scenario():
+        generations = await backend.tag_generations(["user:1"])
+        stored = await backend.set_many({"session": {"role": "admin"}}, 60, ["user:1"], expected_generations=generations)
+        return stored, await backend.get("session")
+
+    assert asyncio.run(scenario()) == (True, {"role": "admin"})
+
+
+def test_memory_evicted_generation_never_matches_again():
+    backend = server.MemoryCacheBackend(maxsize=1)
+
+    async def scenario():
+        generations = await backend.tag_generations(["user:1"])
+        await backend.tag_generations(["user:2"])  # evicts user:1's generation
+        return await backend.set_many({"session": {}}, 60, ["user:1"], expected_generations=generations)
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_memory_tags_forget_evicted_keys():
+    backend = server.MemoryCacheBackend(maxsize=2)
+
+    async def scenario():
+        for i in range(5):
+            await backend.set(f"key{i}", i, 60, ["list:businesses", f"user:{i}"])
+
+    asyncio.run(scenario())
+    assert backend._tags == {"list:businesses": {"key3", "key4"}, "user:3": {"key3"}, "user:4": {"key4"}}
+    assert set(backend._key_tags) == {"key3", "key4"}
+
+
+def test_redis_invalidation_is_shared_between_workers(redis_server):
+    worker_a = server.RedisCacheBackend("redis://fake")
+    worker_b = server.RedisCacheBackend("redis://fake")
+
+    async def scenario():
+        generations = await worker_a.tag_generations(["list:events"])
+        await worker_b.set_many({"old": 1}, 60, ["list:events"])
+        await worker_b.invalidate_tags("list:events")
+        stored = await worker_a.set_many({"page": 2}, 60, ["list:events"], expected_generations=generations)
+        return stored, await worker_a.get_many(["old", "page"])
+
+    assert asyncio.run(scenario()) == (False, {})
+
+
+def test_redis_roundtrip_and_tag_invalidation(redis_server):
+    backend = server.RedisCacheBackend("redis://fake")
+    created = server.datetime(2024, 5, 1, 12, 30)
+
+    async def scenario():
+        generations = await backend.tag_generations(["user:7"])
+        stored = await backend.set_many({"a": {"created_at": created}, "b": [1, 2]}, 60, ["user:7"], expected_generations=generations)
+        before = await backend.get_many(["a", "b"])
+        await backend.invalidate_tags("user:7")
+        return stored, before, await backend.get_many(["a", "b"])
+
+    stored, before, after = asyncio.run(scenario())
+    assert stored is True
+    assert before == {"a": {"created_at": created}, "b": [1, 2]}
+    assert after == {}
+
+
+def test_redis_outage_is_a_miss(redis_server):
+    backend = server.RedisCacheBackend("redis://fake")
+    redis_server.connected = False
+
+    async def scenario():
+        return (
+            await backend.get("key"),
+            await backend.set_many({"key": 1}, 60, ["list:businesses"]),
+            await backend.invalidate_tags("list:businesses"),
+            await backend.tag_generations(["list:businesses"]),
+        )
+
+    assert asyncio.run(scenario()) == (None, False, None, {"list:businesses": -1})
+    assert backend.stats()["errors"] == 4
+
+
+def test_response_cache_drops_result_computed_across_invalidation(memory_cache):
+    cache = server.ResponseCache("test", ttl=60, stale_ttl=60)
+    calls = []
+
+    async def scenario():
+        async def compute():
+            calls.append(1)
+            # An admin change lands while the page is being computed
+            await cache.clear()
+            return ["stale"]
+
+        first = await cache.get_or_compute(("page",), compute)
+
+        async def recompute():
+            calls.append(1)
+            return ["fresh"]
+
+        second = await cache.get_or_compute(("page",), recompute)
+        third = await cache.get_or_compute(("page",), recompute)
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (["stale"], ["fresh"], ["fresh"])
+    assert len(calls) == 2
+
+
+def test_response_cache_single_flight(memory_cache):
+    cache = server.ResponseCache("test", ttl=60, stale_ttl=60)
+    calls = []
+
+    async def scenario():
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["page"]
+
+        return await asyncio.gather(*(cache.get_or_compute(("page",), compute) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [["page"]] * 5
+    assert len(calls) == 1
@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def test_cursor_roundtrip():
+    values = [datetime(2024, 3, 1, 9, 15, 30, 250000), "b7c1", 4.5, None]
+    cursor = server.encode_cursor(values)
+    assert "=" not in cursor
+    assert server.decode_cursor(cursor, len(values)) == values
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", server.encode_cursor(["only one value"])])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        server.decode_cursor(cursor, 2)
+    assert error.value.status_code == 400
+
+
+def seed_businesses(db, count):
+    start = datetime(2024, 1, 1)
+    documents = [
+        # Three businesses share each created_at, so the id tie-breaker matters
+        {"id": f"business-{i:02d}", "business_name": f"Business {i}", "created_at": start + timedelta(minutes=i // 3)}
+        for i in range(count)
+    ]
+    asyncio.run(db.businesses.insert_many([dict(document) for document in documents]))
+    return sorted(documents, key=lambda document: (document["created_at"], document["id"]), reverse=True)
+
+
+def test_keyset_pages_cover_every_document_once_in_order(db):
+    expected = seed_businesses(db, 20)
+
+    async def walk():
+        seen, cursor = [], None
+        while True:
+            page, cursor = await server.fetch_page(db.businesses, {}, server.BUSINESS_SORT, cursor, 0, 6)
+            seen.extend(document["id"] for document in page)
+            if cursor is None:
+                return seen
+
+    assert asyncio.run(walk()) == [document["id"] for document in expected]
+
+
+def test_keyset_query_matches_only_later_documents():
+    after = [datetime(2024, 1, 1), "b"]
+    assert server.keyset_query(server.BUSINESS_SORT, after) == {"$or": [
+        {"created_at": {"$lt": after[0]}},
+        {"created_at": after[0], "id": {"$lt": "b"}},
+    ]}
+
+
+def test_projection_does_not_return_sort_fields(db):
+    seed_businesses(db, 4)
+
+    page, cursor = asyncio.run(
+        server.fetch_page(db.businesses, {}, server.BUSINESS_SORT, None, 0, 2, {"_id": 0, "id": 1, "business_name": 1})
+    )
+    assert cursor is not None
+    assert all(set(document) == {"id", "business_name"} for document in page)
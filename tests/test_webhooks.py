@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+@pytest.fixture
+def client(db, memory_cache, monkeypatch):
+    monkeypatch.setattr(server, "PAYPAL_WEBHOOK_VERIFY", False)
+    return TestClient(server.app)
+
+
+@pytest.fixture
+def subscription(db):
+    document = {
+        "id": "subscription-1",
+        "user_id": "user-1",
+        "business_id": "business-1",
+        "paypal_subscription_id": "I-AGREEMENT",
+        "status": "ACTIVE",
+        "state_changed_at": datetime(2024, 6, 1, 12, 0),
+    }
+    asyncio.run(db.subscriptions.insert_one(dict(document)))
+    asyncio.run(db.businesses.insert_one({"id": "business-1", "subscription_status": "active"}))
+    return document
+
+
+def event(event_id, event_type, create_time, resource):
+    return {"id": event_id, "event_type": event_type, "create_time": create_time, "resource": resource}
+
+
+def stored_status(db):
+    return asyncio.run(db.subscriptions.find_one({"paypal_subscription_id": "I-AGREEMENT"}))["status"]
+
+
+def test_redelivered_event_is_applied_once(client, db, monkeypatch):
+    applied = []
+
+    async def apply(event):
+        applied.append(event["id"])
+
+    monkeypatch.setattr(server, "apply_webhook_event", apply)
+    payload = event("WH-1", "PAYMENT.SALE.COMPLETED", "2024-06-02T10:00:00Z", {"id": "SALE-1"})
+
+    first = client.post("/api/paypal/webhook", json=payload)
+    second = client.post("/api/paypal/webhook", json=payload)
+
+    assert first.json() == {"status": "processed"}
+    assert second.json() == {"status": "duplicate"}
+    assert applied == ["WH-1"]
+
+
+def test_failed_event_can_be_retried(client, db, monkeypatch):
+    attempts = []
+
+    async def apply(event):
+        attempts.append(event["id"])
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(server, "apply_webhook_event", apply)
+    payload = event("WH-2", "PAYMENT.SALE.COMPLETED", "2024-06-02T10:00:00Z", {"id": "SALE-2"})
+
+    assert client.post("/api/paypal/webhook", json=payload).status_code == 500
+    assert client.post("/api/paypal/webhook", json=payload).json() == {"status": "processed"}
+    assert attempts == ["WH-2", "WH-2"]
+
+
+def test_older_event_does_not_roll_back_status(client, db, subscription):
+    cancelled = event("WH-3", "BILLING.SUBSCRIPTION.CANCELLED", "2024-06-03T10:00:00Z", {"id": "I-AGREEMENT"})
+    late_reactivation = event("WH-4", "BILLING.SUBSCRIPTION.RE-ACTIVATED", "2024-06-02T10:00:00Z", {"id": "I-AGREEMENT"})
+
+    client.post("/api/paypal/webhook", json=cancelled)
+    client.post("/api/paypal/webhook", json=late_reactivation)
+
+    assert stored_status(db) == "CANCELLED"
+    business = asyncio.run(db.businesses.find_one({"id": "business-1"}))
+    assert business["subscription_status"] == server.SubscriptionStatus.CANCELLED
+
+
+def test_newer_event_is_applied(client, db, subscription):
+    suspended = event("WH-5", "BILLING.SUBSCRIPTION.SUSPENDED", "2024-06-03T10:00:00Z", {"id": "I-AGREEMENT"})
+    reactivated = event("WH-6", "BILLING.SUBSCRIPTION.RE-ACTIVATED", "2024-06-04T10:00:00Z", {"id": "I-AGREEMENT"})
+
+    client.post("/api/paypal/webhook", json=suspended)
+    assert stored_status(db) == "SUSPENDED"
+    client.post("/api/paypal/webhook", json=reactivated)
+    assert stored_status(db) == "ACTIVE"
+
+
+@pytest.mark.parametrize("closed_status", ["CANCELLED", "EXPIRED", "SUSPENDED"])
+def test_sale_never_reopens_subscription(client, db, subscription, closed_status):
+    asyncio.run(db.subscriptions.update_one({"id": "subscription-1"}, {"$set": {"status": closed_status}}))
+    sale = event("WH-7", "PAYMENT.SALE.COMPLETED", "2024-06-05T10:00:00Z", {"id": "SALE-7", "billing_agreement_id": "I-AGREEMENT"})
+
+    client.post("/api/paypal/webhook", json=sale)
+
+    assert stored_status(db) == closed_status